@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+宿主机端口分配登记表
+用 SQLite 记录每个服务占用的宿主机端口，分配在单个写事务中完成，
+并发部署不会拿到同一个端口。候选端口用 bind 检测是否被监听，
+`docker ps` 只在登记表过期（默认 5 分钟）或显式 reconcile 时才执行。
+
+用法:
+    python3 scripts/port_registry.py allocate <服务名> [--count N] [--start 9000]
+    python3 scripts/port_registry.py release <服务名>
+    python3 scripts/port_registry.py list [--json]
+    python3 scripts/port_registry.py reconcile
+
+通用参数:
+    --db PATH       登记表路径（默认 $DEPLOY_PORT_DB 或 ~/.local/share/deploy-service/ports.db）
+    --docker CMD    docker 可执行文件（默认 $DEPLOY_DOCKER_BIN 或 docker，测试时可指向假的 docker 脚本）
+"""
+
+import argparse
+import json
+import os
+import re
+import socket
+import sqlite3
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+DEFAULT_DB = Path.home() / ".local" / "share" / "deploy-service" / "ports.db"
+DEFAULT_START = 9000
+MAX_PORT = 65535
+# 距上次 reconcile 超过该秒数时，分配前先同步 docker 端口
+RECONCILE_TTL = 300
+DOCKER_TIMEOUT = 10
+
+# docker ps 的 Ports 列，如 "0.0.0.0:9001->80/tcp, :::9001->80/tcp"
+DOCKER_PORT_RE = re.compile(r":(\d+)->")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ports (
+    port INTEGER PRIMARY KEY,
+    service TEXT NOT NULL,
+    kind TEXT NOT NULL,          -- reserved: 本工具分配; external: docker 中已存在
+    updated TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ports_service ON ports (service);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def connect(db_path):
+    """打开登记表；autocommit 模式下由调用方显式 BEGIN IMMEDIATE"""
+    Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(db_path), timeout=30, isolation_level=None)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def now_iso():
+    return datetime.now().isoformat(timespec="seconds")
+
+
+def port_is_free(port):
+    """尝试 bind 端口，失败说明已有进程监听（含 docker-proxy）"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        try:
+            sock.bind(("0.0.0.0", port))
+        except OSError:
+            return False
+    return True
+
+
+def docker_ports(docker_bin):
+    """返回 {宿主机端口: 容器名}；docker 不可用时返回 None"""
+    try:
+        result = subprocess.run(
+            [docker_bin, "ps", "--format", "{{.Names}}\t{{.Ports}}"],
+            capture_output=True, text=True, timeout=DOCKER_TIMEOUT,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    if result.returncode != 0:
+        return None
+
+    ports = {}
+    for line in result.stdout.splitlines():
+        name, _, port_spec = line.partition("\t")
+        for match in DOCKER_PORT_RE.finditer(port_spec):
+            ports[int(match.group(1))] = name.strip()
+    return ports
+
+
+def reconcile(conn, docker_bin):
+    """把 docker 已发布的端口同步为 external 记录（须在写事务中调用）
+
+    docker 中已不存在的 external 记录会被删除；reserved 记录保持不变。
+    返回同步到的端口数，docker 不可用时返回 None。
+    """
+    live = docker_ports(docker_bin)
+    if live is None:
+        return None
+
+    reserved = {row[0] for row in conn.execute("SELECT port FROM ports WHERE kind = 'reserved'")}
+    conn.execute("DELETE FROM ports WHERE kind = 'external'")
+    stamp = now_iso()
+    conn.executemany(
+        "INSERT INTO ports (port, service, kind, updated) VALUES (?, ?, 'external', ?)",
+        [(port, name, stamp) for port, name in live.items() if port not in reserved],
+    )
+    conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('reconciled_at', ?)", (str(time.time()),))
+    return len(live)
+
+
+def needs_reconcile(conn):
+    row = conn.execute("SELECT value FROM meta WHERE key = 'reconciled_at'").fetchone()
+    return row is None or time.time() - float(row[0]) > RECONCILE_TTL
+
+
+def allocate(conn, service, count=1, start=DEFAULT_START, docker_bin="docker", force_reconcile=False):
+    """为服务分配 count 个连续端口；服务已有同样数量的端口时直接返回已有端口
+
+    已有端口数与 count 不同时抛出 RuntimeError，不会静默返回部分端口。
+
+    按部署规则，从 start 与已登记最大端口 +1 中较大者开始，
+    跳过被监听的端口，选择连续的空闲端口。
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        existing = [row[0] for row in conn.execute(
+            "SELECT port FROM ports WHERE service = ? AND kind = 'reserved' ORDER BY port", (service,))]
+        if existing:
+            if len(existing) != count:
+                raise RuntimeError(
+                    f"{service} 已登记 {len(existing)} 个端口 ({', '.join(map(str, existing))})，"
+                    f"与请求的 {count} 个不符；请先 release 再重新分配")
+            conn.execute("COMMIT")
+            return existing
+
+        if force_reconcile or needs_reconcile(conn):
+            reconcile(conn, docker_bin)
+
+        taken = {row[0] for row in conn.execute("SELECT port FROM ports")}
+        highest = conn.execute("SELECT MAX(port) FROM ports WHERE port >= ?", (start,)).fetchone()[0]
+        candidate = max(start, (highest or 0) + 1)
+
+        while candidate + count - 1 <= MAX_PORT:
+            block = range(candidate, candidate + count)
+            busy = next((p for p in block if p in taken or not port_is_free(p)), None)
+            if busy is None:
+                stamp = now_iso()
+                conn.executemany(
+                    "INSERT INTO ports (port, service, kind, updated) VALUES (?, ?, 'reserved', ?)",
+                    [(port, service, stamp) for port in block],
+                )
+                conn.execute("COMMIT")
+                return list(block)
+            candidate = busy + 1
+
+        raise RuntimeError(f"没有 {count} 个连续的空闲端口（起始 {start}）")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def release(conn, service):
+    """释放服务预留（reserved）的端口，返回释放的端口列表
+
+    external 记录对应 docker 中仍在运行的容器，只由 reconcile 维护。
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    ports = [row[0] for row in conn.execute(
+        "SELECT port FROM ports WHERE service = ? AND kind = 'reserved' ORDER BY port", (service,))]
+    conn.execute("DELETE FROM ports WHERE service = ? AND kind = 'reserved'", (service,))
+    conn.execute("COMMIT")
+    return ports
+
+
+def list_ports(conn):
+    return [
+        {"port": port, "service": service, "kind": kind, "updated": updated}
+        for port, service, kind, updated in conn.execute(
+            "SELECT port, service, kind, updated FROM ports ORDER BY port")
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="宿主机端口分配登记表")
+    parser.add_argument("--db", default=os.environ.get("DEPLOY_PORT_DB", str(DEFAULT_DB)),
+                        help="登记表路径")
+    parser.add_argument("--docker", default=os.environ.get("DEPLOY_DOCKER_BIN", "docker"),
+                        help="docker 可执行文件")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    alloc = subparsers.add_parser("allocate", help="为服务分配端口")
+    alloc.add_argument("service")
+    alloc.add_argument("--count", type=int, default=1, help="需要的连续端口数")
+    alloc.add_argument("--start", type=int, default=DEFAULT_START, help=f"起始端口（默认 {DEFAULT_START}）")
+    alloc.add_argument("--reconcile", action="store_true", help="分配前强制同步 docker 端口")
+    alloc.add_argument("--json", action="store_true")
+
+    rel = subparsers.add_parser("release", help="释放服务的端口")
+    rel.add_argument("service")
+
+    lst = subparsers.add_parser("list", help="列出已登记端口")
+    lst.add_argument("--json", action="store_true")
+
+    subparsers.add_parser("reconcile", help="同步 docker 已发布端口")
+
+    args = parser.parse_args()
+    conn = connect(args.db)
+
+    if args.command == "allocate":
+        try:
+            ports = allocate(conn, args.service, args.count, args.start, args.docker, args.reconcile)
+        except RuntimeError as e:
+            print(f"❌ {e}", file=sys.stderr)
+            sys.exit(1)
+        if args.json:
+            print(json.dumps({"service": args.service, "ports": ports}))
+        else:
+            print(" ".join(str(port) for port in ports))
+
+    elif args.command == "release":
+        ports = release(conn, args.service)
+        print(f"✅ 已释放 {args.service}: {', '.join(map(str, ports)) or '无'}")
+
+    elif args.command == "list":
+        entries = list_ports(conn)
+        if args.json:
+            print(json.dumps(entries, indent=2, ensure_ascii=False))
+        else:
+            for entry in entries:
+                print(f"  {entry['port']:>5}  {entry['kind']:<8}  {entry['service']}")
+
+    elif args.command == "reconcile":
+        conn.execute("BEGIN IMMEDIATE")
+        synced = reconcile(conn, args.docker)
+        conn.execute("COMMIT")
+        if synced is None:
+            print("⚠️  docker 不可用，未同步", file=sys.stderr)
+            sys.exit(1)
+        print(f"✅ 已同步 {synced} 个 docker 端口")
+
+
+if __name__ == "__main__":
+    main()
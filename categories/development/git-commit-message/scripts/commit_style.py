@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+提交风格画像工具
+从 git log 中提取仓库的提交风格（前缀频率、scope 词汇、语言、标题长度、body 使用率），
+保存到 .git/commit-style.json，之后只增量处理上次画像之后的新提交。
+
+用法:
+    python3 scripts/commit_style.py [仓库路径] [--json] [--rebuild] [--max-count N]
+"""
+
+import argparse
+import json
+import re
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+
+PROFILE_NAME = "commit-style.json"
+PROFILE_VERSION = 1
+
+# 首次画像最多读取的提交数（只关心近期风格）
+DEFAULT_MAX_COUNT = 1000
+# 保留的 scope 数量与最近提交示例数量，控制画像大小
+MAX_SCOPES = 50
+RECENT_SUBJECTS = 5
+
+PREFIX_RE = re.compile(r"^(?P<type>[a-zA-Z]+)(?:\((?P<scope>[^)]*)\))?!?[:：]\s*")
+CJK_RE = re.compile(r"[一-鿿]")
+
+
+def run_git(repo, *args):
+    """执行 git 命令，失败时返回 None"""
+    result = subprocess.run(
+        ["git", "-C", str(repo), *args],
+        capture_output=True, text=True, encoding="utf-8", errors="replace",
+    )
+    if result.returncode != 0:
+        return None
+    return result.stdout.strip()
+
+
+def iter_commits(repo, rev_range, max_count=None):
+    """流式读取提交，按从新到旧返回 (hash, subject, has_body)"""
+    cmd = ["git", "-C", str(repo), "log", "--no-merges", "--format=%H%x1f%s%x1f%b%x1e"]
+    if max_count:
+        cmd.append(f"--max-count={max_count}")
+    cmd.append(rev_range)
+    proc = subprocess.Popen(
+        cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+        text=True, encoding="utf-8", errors="replace",
+    )
+    buffer = ""
+    try:
+        for chunk in iter(lambda: proc.stdout.read(65536), ""):
+            buffer += chunk
+            *records, buffer = buffer.split("\x1e")
+            for record in records:
+                fields = record.lstrip("\n").split("\x1f", 2)
+                if len(fields) == 3:
+                    yield fields[0], fields[1], bool(fields[2].strip())
+    finally:
+        proc.stdout.close()
+        proc.wait()
+
+
+def empty_profile():
+    """新建空画像"""
+    return {
+        "version": PROFILE_VERSION,
+        "head": None,
+        "updated": None,
+        "commits": 0,
+        "prefixes": {},
+        "scopes": {},
+        "languages": {"zh": 0, "en": 0},
+        "subject_length_total": 0,
+        "with_body": 0,
+        "recent": [],
+    }
+
+
+def profile_path(repo):
+    """画像文件位于 git 公共目录下（worktree 共享同一份）"""
+    git_dir = run_git(repo, "rev-parse", "--git-common-dir")
+    if git_dir is None:
+        return None
+    path = Path(git_dir)
+    if not path.is_absolute():
+        path = Path(repo) / path
+    return path / PROFILE_NAME
+
+
+def load_profile(path):
+    """读取画像，格式不符时返回 None"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            profile = json.load(f)
+    except (IOError, json.JSONDecodeError):
+        return None
+    if profile.get("version") != PROFILE_VERSION:
+        return None
+    return profile
+
+
+def add_commit(profile, subject, has_body):
+    """把一条提交计入画像"""
+    match = PREFIX_RE.match(subject)
+    prefix = match.group("type").lower() if match else "none"
+    profile["prefixes"][prefix] = profile["prefixes"].get(prefix, 0) + 1
+    if match and match.group("scope"):
+        scope = match.group("scope").strip()
+        profile["scopes"][scope] = profile["scopes"].get(scope, 0) + 1
+
+    lang = "zh" if CJK_RE.search(subject) else "en"
+    profile["languages"][lang] += 1
+    profile["subject_length_total"] += len(subject)
+    if has_body:
+        profile["with_body"] += 1
+    profile["commits"] += 1
+
+
+def update_profile(repo, profile=None, max_count=DEFAULT_MAX_COUNT):
+    """增量更新画像；上次画像的提交不在当前历史中（如 rebase）时重建"""
+    head = run_git(repo, "rev-parse", "HEAD")
+    if head is None:
+        return profile or empty_profile()
+
+    if profile and profile["head"] == head:
+        return profile
+
+    if profile and profile["head"]:
+        is_ancestor = subprocess.run(
+            ["git", "-C", str(repo), "merge-base", "--is-ancestor", profile["head"], head],
+            capture_output=True,
+        ).returncode == 0
+        if not is_ancestor:
+            profile = None
+
+    if profile and profile["head"]:
+        rev_range, limit = f"{profile['head']}..{head}", None
+    else:
+        profile, rev_range, limit = empty_profile(), head, max_count
+
+    new_subjects = []
+    for _, subject, has_body in iter_commits(repo, rev_range, limit):
+        add_commit(profile, subject, has_body)
+        if len(new_subjects) < RECENT_SUBJECTS:
+            new_subjects.append(subject)
+
+    profile["recent"] = (new_subjects + profile["recent"])[:RECENT_SUBJECTS]
+    top_scopes = sorted(profile["scopes"].items(), key=lambda item: -item[1])[:MAX_SCOPES]
+    profile["scopes"] = dict(top_scopes)
+    profile["head"] = head
+    profile["updated"] = datetime.now().isoformat()
+    return profile
+
+
+def summarize(profile):
+    """生成供提交消息生成使用的风格摘要"""
+    total = profile["commits"] or 1
+    prefixes = sorted(profile["prefixes"].items(), key=lambda item: -item[1])
+    languages = profile["languages"]
+    return {
+        "commits": profile["commits"],
+        "language": "zh" if languages["zh"] >= languages["en"] else "en",
+        "prefixes": [{"prefix": p, "ratio": round(n / total, 2)} for p, n in prefixes[:8]],
+        "conventional": round(1 - profile["prefixes"].get("none", 0) / total, 2),
+        "scopes": list(profile["scopes"])[:10],
+        "avg_subject_length": round(profile["subject_length_total"] / total),
+        "body_ratio": round(profile["with_body"] / total, 2),
+        "recent": profile["recent"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="提取并缓存仓库提交风格画像")
+    parser.add_argument("repo", nargs="?", default=".", help="仓库路径（默认当前目录）")
+    parser.add_argument("--json", action="store_true", help="以 JSON 输出风格摘要")
+    parser.add_argument("--rebuild", action="store_true", help="忽略已有画像并重新扫描")
+    parser.add_argument("--max-count", type=int, default=DEFAULT_MAX_COUNT,
+                        help=f"首次画像最多读取的提交数（默认 {DEFAULT_MAX_COUNT}）")
+    args = parser.parse_args()
+
+    repo = Path(args.repo).resolve()
+    path = profile_path(repo)
+    if path is None:
+        print(f"❌ 不是 git 仓库: {repo}")
+        sys.exit(1)
+
+    cached = None if args.rebuild else load_profile(path)
+    previous_head = cached["head"] if cached else None
+    profile = update_profile(repo, cached, args.max_count)
+    if cached is None or profile["head"] != previous_head:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(profile, f, ensure_ascii=False, separators=(",", ":"))
+
+    summary = summarize(profile)
+    if args.json:
+        print(json.dumps(summary, indent=2, ensure_ascii=False))
+        return
+
+    print(f"📊 提交风格（基于 {summary['commits']} 条提交）")
+    print(f"   语言: {summary['language']}")
+    print("   前缀: " + ", ".join(f"{p['prefix']} {p['ratio']:.0%}" for p in summary["prefixes"]))
+    if summary["scopes"]:
+        print("   Scope: " + ", ".join(summary["scopes"]))
+    print(f"   平均标题长度: {summary['avg_subject_length']} 字符")
+    print(f"   带 body 比例: {summary['body_ratio']:.0%}")
+    print("   最近提交:")
+    for subject in summary["recent"]:
+        print(f"     - {subject}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+暂存区 diff 摘要工具
+单次流式解析 `git diff --cached`，输出每个文件的增删统计、重命名与权限变化；
+lockfile、vendored 目录和二进制文件折叠为一行摘要，其余 hunk 按信息量
+在字节预算内择优保留，使提交消息生成的输入大小与提交规模无关。
+
+用法:
+    python3 scripts/diff_summary.py [仓库路径] [--budget BYTES] [--max-hunk-bytes BYTES] [--json]
+"""
+
+import argparse
+import heapq
+import json
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+DEFAULT_BUDGET = 16000
+DEFAULT_MAX_HUNK_BYTES = 4000
+
+LOCKFILES = {
+    "package-lock.json", "yarn.lock", "pnpm-lock.yaml", "npm-shrinkwrap.json",
+    "Cargo.lock", "poetry.lock", "uv.lock", "Pipfile.lock", "go.sum",
+    "composer.lock", "Gemfile.lock", "bun.lockb",
+}
+VENDORED_DIRS = ("vendor/", "node_modules/", "third_party/", "third-party/", "dist/", "build/")
+VENDORED_SUFFIXES = (".min.js", ".min.css", ".map", ".pb.go", "_pb2.py")
+BINARY_SUFFIXES = (
+    ".png", ".jpg", ".jpeg", ".gif", ".ico", ".webp", ".pdf", ".zip", ".gz", ".tgz",
+    ".jar", ".woff", ".woff2", ".ttf", ".otf", ".so", ".dll", ".exe", ".bin",
+)
+
+# 含特殊字符的路径会被 git 加引号并转义，如 "a/\344\270\255.md"
+QUOTED_PATH = r'"(?:[^"\\]|\\.)*"'
+DIFF_HEADER_RE = re.compile(rf"^diff --git ({QUOTED_PATH}|a/.*?) ({QUOTED_PATH}|b/.*)$")
+C_ESCAPES = {"a": 7, "b": 8, "t": 9, "n": 10, "v": 11, "f": 12, "r": 13, '"': 34, "\\": 92}
+HUNK_RE = re.compile(r"^@@ -\d+(?:,\d+)? \+\d+(?:,\d+)? @@(.*)$")
+
+
+def collapse_reason(path):
+    """返回文件需要折叠的原因（lockfile / vendored / binary），否则返回 None"""
+    name = path.rsplit("/", 1)[-1]
+    if name in LOCKFILES:
+        return "lockfile"
+    if name.lower().endswith(BINARY_SUFFIXES):
+        return "binary"
+    padded = "/" + path
+    if any(f"/{d}" in padded for d in VENDORED_DIRS) or path.endswith(VENDORED_SUFFIXES):
+        return "vendored"
+    return None
+
+
+def line_bytes(line):
+    """输出一行占用的字节数（UTF-8 编码加换行符），预算按字节计算"""
+    return len(line.encode("utf-8")) + 1
+
+
+class Hunk:
+    """一个 hunk 的文本与信息量评分"""
+
+    def __init__(self, file_index, seq, header, first_in_file):
+        self.file_index = file_index
+        self.seq = seq
+        self.lines = [header]
+        self.size = line_bytes(header)
+        self.truncated = False
+        self.changed = 0
+        # 函数上下文（@@ ... @@ def foo）与文件首个 hunk 更有助于理解改动
+        self.bonus = (3 if HUNK_RE.match(header).group(1).strip() else 0) + (10 if first_in_file else 0)
+
+    def add(self, line, max_bytes):
+        if line[:1] in ("+", "-") and line[1:].strip():
+            self.changed += 1
+        if self.truncated:
+            return
+        size = line_bytes(line)
+        if self.size + size > max_bytes:
+            self.lines.append("... (hunk truncated)")
+            self.truncated = True
+            return
+        self.lines.append(line)
+        self.size += size
+
+    @property
+    def score(self):
+        return self.changed + self.bonus
+
+
+def unquote_path(path):
+    """还原 git 的 C 风格引号路径（八进制转义按 UTF-8 解码）"""
+    if not (len(path) >= 2 and path[0] == path[-1] == '"'):
+        return path
+    out = bytearray()
+    chars = path[1:-1]
+    i = 0
+    while i < len(chars):
+        ch = chars[i]
+        if ch == "\\" and i + 1 < len(chars):
+            nxt = chars[i + 1]
+            if nxt in "01234567":
+                out.append(int(chars[i + 1:i + 4], 8))
+                i += 4
+                continue
+            out.append(C_ESCAPES.get(nxt, ord(nxt)))
+            i += 2
+            continue
+        out.extend(ch.encode("utf-8"))
+        i += 1
+    return out.decode("utf-8", errors="replace")
+
+
+def strip_prefix(path):
+    """去掉 diff 头中的 a/、b/ 前缀"""
+    path = unquote_path(path)
+    return path[2:] if path[:2] in ("a/", "b/") else path
+
+
+def new_file_entry(old_path, new_path):
+    return {
+        "path": new_path,
+        "old_path": old_path if old_path != new_path else None,
+        "status": "M",
+        "added": 0,
+        "deleted": 0,
+        "binary": False,
+        "old_mode": None,
+        "new_mode": None,
+        "similarity": None,
+        "collapsed": collapse_reason(new_path),
+    }
+
+
+def iter_diff_lines(repo):
+    """流式读取 `git diff --cached` 的每一行"""
+    proc = subprocess.Popen(
+        ["git", "-C", str(repo), "-c", "core.quotePath=false", "diff", "--cached", "--no-color", "--no-ext-diff", "-M"],
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+    )
+    try:
+        for raw in proc.stdout:
+            yield raw.decode("utf-8", errors="replace").rstrip("\n")
+    finally:
+        proc.stdout.close()
+        proc.wait()
+
+
+def summarize_diff(lines, budget=DEFAULT_BUDGET, max_hunk_bytes=DEFAULT_MAX_HUNK_BYTES):
+    """单次解析 diff 行流，返回 (files, hunks, dropped_hunks)"""
+    files = []
+    kept = []  # 按 (score, seq) 排序的最小堆
+    kept_bytes = 0
+    dropped = 0
+    seq = 0
+    current = None
+    hunk = None
+    in_hunk = False
+
+    def finish_hunk():
+        nonlocal kept_bytes, dropped, hunk
+        if hunk is None:
+            return
+        heapq.heappush(kept, (hunk.score, hunk.seq, hunk))
+        kept_bytes += hunk.size
+        while kept_bytes > budget and kept:
+            _, _, evicted = heapq.heappop(kept)
+            kept_bytes -= evicted.size
+            dropped += 1
+        hunk = None
+
+    for line in lines:
+        header = DIFF_HEADER_RE.match(line)
+        if header:
+            finish_hunk()
+            current = new_file_entry(strip_prefix(header.group(1)), strip_prefix(header.group(2)))
+            files.append(current)
+            in_hunk = False
+            continue
+        if current is None:
+            continue
+
+        if line.startswith("@@"):
+            finish_hunk()
+            in_hunk = True
+            if current["collapsed"] or current["binary"]:
+                continue
+            seq += 1
+            hunk = Hunk(len(files) - 1, seq, line, current["added"] + current["deleted"] == 0)
+            continue
+
+        if in_hunk:
+            if line.startswith("+"):
+                current["added"] += 1
+            elif line.startswith("-"):
+                current["deleted"] += 1
+            if hunk is not None:
+                hunk.add(line, max_hunk_bytes)
+            continue
+
+        if line.startswith("new file mode"):
+            current["status"] = "A"
+            current["new_mode"] = line.split()[-1]
+        elif line.startswith("deleted file mode"):
+            current["status"] = "D"
+            current["old_mode"] = line.split()[-1]
+        elif line.startswith("old mode"):
+            current["old_mode"] = line.split()[-1]
+        elif line.startswith("new mode"):
+            current["new_mode"] = line.split()[-1]
+        elif line.startswith("similarity index"):
+            current["similarity"] = line.split()[-1]
+        elif line.startswith(("rename from ", "copy from ")):
+            current["status"] = "R" if line.startswith("rename") else "C"
+            current["old_path"] = unquote_path(line.split(" ", 2)[2])
+        elif line.startswith(("rename to ", "copy to ")):
+            # 以 rename/copy 行的路径为准，不受 diff 头中空格歧义影响
+            current["path"] = unquote_path(line.split(" ", 2)[2])
+            current["collapsed"] = collapse_reason(current["path"])
+        elif line.startswith("Binary files") or line.startswith("GIT binary patch"):
+            current["binary"] = True
+
+    finish_hunk()
+    hunks = sorted((item[2] for item in kept), key=lambda h: h.seq)
+    return files, hunks, dropped
+
+
+def format_file(entry):
+    """单个文件的一行摘要"""
+    path = entry["path"]
+    if entry["old_path"]:
+        path = f"{entry['old_path']} -> {path}"
+        if entry["similarity"]:
+            path += f" ({entry['similarity']})"
+    line = f" {entry['status']} {path}"
+    if entry["binary"]:
+        line += "  [binary]"
+    else:
+        line += f"  +{entry['added']} -{entry['deleted']}"
+    if entry["old_mode"] and entry["new_mode"]:
+        line += f"  [mode {entry['old_mode']} -> {entry['new_mode']}]"
+    if entry["collapsed"] and not entry["binary"]:
+        line += f"  [{entry['collapsed']}]"
+    return line
+
+
+def main():
+    parser = argparse.ArgumentParser(description="在字节预算内摘要暂存区 diff")
+    parser.add_argument("repo", nargs="?", default=".", help="仓库路径（默认当前目录）")
+    parser.add_argument("--budget", type=int, default=DEFAULT_BUDGET,
+                        help=f"保留 hunk 的总字节预算（默认 {DEFAULT_BUDGET}）")
+    parser.add_argument("--max-hunk-bytes", type=int, default=DEFAULT_MAX_HUNK_BYTES,
+                        help=f"单个 hunk 最多保留的字节数（默认 {DEFAULT_MAX_HUNK_BYTES}）")
+    parser.add_argument("--json", action="store_true", help="以 JSON 输出")
+    args = parser.parse_args()
+
+    repo = Path(args.repo).resolve()
+    files, hunks, dropped = summarize_diff(iter_diff_lines(repo), args.budget, args.max_hunk_bytes)
+
+    if not files:
+        print("暂存区为空")
+        sys.exit(1)
+
+    if args.json:
+        print(json.dumps({
+            "files": files,
+            "hunks": [{"path": files[h.file_index]["path"], "text": "\n".join(h.lines)} for h in hunks],
+            "dropped_hunks": dropped,
+        }, indent=2, ensure_ascii=False))
+        return
+
+    added = sum(entry["added"] for entry in files)
+    deleted = sum(entry["deleted"] for entry in files)
+    print(f"📋 暂存变更: {len(files)} 个文件, +{added} -{deleted}")
+    for entry in files:
+        print(format_file(entry))
+
+    print("")
+    last_index = None
+    for h in hunks:
+        if h.file_index != last_index:
+            print(f"--- {files[h.file_index]['path']}")
+            last_index = h.file_index
+        print("\n".join(h.lines))
+    if dropped:
+        print(f"\n... 省略 {dropped} 个信息量较低的 hunk（预算 {args.budget} 字节）")
+
+
+if __name__ == "__main__":
+    main()
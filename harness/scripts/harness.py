@@ -0,0 +1,523 @@
+#!/usr/bin/env python3
+"""
+Harness Task Tool
+
+Helpers for the task execution cycle that are too slow or error-prone to do
+by hand from the prompts.
+
+Usage:
+    python harness.py checkpoint <task-id> --step N --total M --description "..." [--files f1 f2 ...]
+    python harness.py verify <task-id> [--json]
+    python harness.py snapshot <task-id> [--scope path ...]
+    python harness.py rollback <task-id>
+    python harness.py drop-snapshot <task-id>
+
+`checkpoint` appends a checkpoint to the task in feature_list.json together with
+a manifest (path, size, mtime, sha256) of the files it touched. `verify`
+re-stats those files, re-hashes only the ones whose size/mtime changed, and
+reports `resume`, `partial`, `mismatch` or `unverified` (checkpoints without
+a manifest, which must be checked by hand).
+
+`snapshot` records the working tree and index at task start as git objects
+(a `git stash create` commit plus the untracked files inside the task scope)
+without touching any file. `rollback` restores only the paths that changed
+since the snapshot, so unrelated uncommitted work and ignored build caches
+survive a failed attempt.
+
+Both commands operate on the current directory unless --project is given.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+FEATURE_LIST = "feature_list.json"
+SNAPSHOT_REF_PREFIX = "refs/harness/snapshots/"
+# Harness state is updated during rollback and must never be restored
+HARNESS_FILES = {FEATURE_LIST, FEATURE_LIST + ".bak", FEATURE_LIST + ".tmp", "claude-progress.txt"}
+HASH_CHUNK_SIZE = 1024 * 1024
+MAX_HASH_WORKERS = 8
+
+# Exit codes for `verify`, so shell callers can branch without parsing output
+EXIT_RESUME = 0
+EXIT_MISMATCH = 1
+EXIT_PARTIAL = 2
+EXIT_UNVERIFIED = 3
+
+
+def now_iso() -> str:
+    return datetime.now().strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def load_feature_list(project_path: Path) -> dict:
+    """Load feature_list.json, falling back to the .bak copy if it is corrupted."""
+    path = project_path / FEATURE_LIST
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError:
+        backup = project_path / (FEATURE_LIST + ".bak")
+        print(f"⚠️  {FEATURE_LIST} corrupted, restoring from {backup.name}", file=sys.stderr)
+        return json.loads(backup.read_text(encoding="utf-8"))
+
+
+def save_feature_list(project_path: Path, feature_list: dict) -> None:
+    """Back up the current file, then replace it atomically."""
+    path = project_path / FEATURE_LIST
+    if path.exists():
+        shutil.copyfile(path, project_path / (FEATURE_LIST + ".bak"))
+    tmp_path = path.with_suffix(".json.tmp")
+    tmp_path.write_text(json.dumps(feature_list, indent=2, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def find_task(feature_list: dict, task_id: str) -> dict:
+    for feature in feature_list.get("features", []):
+        if feature.get("id") == task_id:
+            return feature
+    raise KeyError(task_id)
+
+
+def hash_file(path: Path) -> str:
+    """Compute the SHA-256 of a file."""
+    sha256_hash = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            sha256_hash.update(chunk)
+    return sha256_hash.hexdigest()
+
+
+def hash_files(paths: List[Path]) -> List[Optional[str]]:
+    """Hash files in parallel; unreadable files hash to None."""
+    def safe_hash(path: Path) -> Optional[str]:
+        try:
+            return hash_file(path)
+        except OSError:
+            return None
+
+    if len(paths) <= 1:
+        return [safe_hash(path) for path in paths]
+    with ThreadPoolExecutor(max_workers=min(MAX_HASH_WORKERS, len(paths))) as pool:
+        return list(pool.map(safe_hash, paths))
+
+
+def build_manifest(project_path: Path, files: List[str]) -> List[dict]:
+    """Describe the current state of `files` (relative to the project root)."""
+    rel_paths = sorted({os.path.relpath(project_path / f, project_path) for f in files})
+    entries = []
+    present = []
+    for rel_path in rel_paths:
+        try:
+            st = os.stat(project_path / rel_path)
+        except FileNotFoundError:
+            entries.append({"path": rel_path, "deleted": True})
+            continue
+        entry = {"path": rel_path, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+        entries.append(entry)
+        present.append(entry)
+
+    hashes = hash_files([project_path / entry["path"] for entry in present])
+    for entry, digest in zip(present, hashes):
+        entry["sha256"] = digest
+    return entries
+
+
+def add_checkpoint(project_path: Path, task_id: str, step: int, total: int,
+                   description: str, files: List[str]) -> dict:
+    """Append a checkpoint (with file manifest) to a task and save."""
+    feature_list = load_feature_list(project_path)
+    task = find_task(feature_list, task_id)
+    checkpoint = {
+        "step": step,
+        "total": total,
+        "description": description,
+        "timestamp": now_iso(),
+    }
+    if files:
+        checkpoint["files"] = build_manifest(project_path, files)
+    task.setdefault("checkpoints", []).append(checkpoint)
+    save_feature_list(project_path, feature_list)
+    return checkpoint
+
+
+def check_entries(project_path: Path, entries: List[dict]) -> List[Tuple[dict, str]]:
+    """Compare manifest entries with the working tree.
+
+    Returns (entry, problem) pairs for entries that do not match. Files whose
+    size and mtime are unchanged are trusted without re-hashing.
+    """
+    problems = []
+    to_hash = []
+    for entry in entries:
+        path = project_path / entry["path"]
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            if not entry.get("deleted"):
+                problems.append((entry, "missing"))
+            continue
+        if entry.get("deleted"):
+            problems.append((entry, "exists"))
+        elif st.st_size != entry["size"]:
+            problems.append((entry, "size"))
+        elif st.st_mtime_ns != entry.get("mtime_ns"):
+            to_hash.append(entry)
+
+    hashes = hash_files([project_path / entry["path"] for entry in to_hash])
+    for entry, digest in zip(to_hash, hashes):
+        if digest != entry.get("sha256"):
+            problems.append((entry, "content"))
+    return problems
+
+
+def verify_task(project_path: Path, task: dict) -> dict:
+    """Verify a task's checkpoints against the working tree.
+
+    Each file is checked against the latest checkpoint that recorded it. The
+    result is `resume` when every checkpoint matches, `partial` when a prefix
+    of checkpoints matches (resume from the last matching step), and
+    `mismatch` otherwise. If a checkpoint in the matching prefix has no file
+    manifest (recorded without --files, or by hand), nothing proves it and
+    the result is `unverified`.
+    """
+    checkpoints = task.get("checkpoints", [])
+    latest: Dict[str, Tuple[int, dict]] = {}
+    for index, checkpoint in enumerate(checkpoints):
+        for entry in checkpoint.get("files", []):
+            latest[entry["path"]] = (index, entry)
+
+    problems = check_entries(project_path, [entry for _, entry in latest.values()])
+    owner = {entry["path"]: index for index, entry in latest.values()}
+    first_bad = min((owner[entry["path"]] for entry, _ in problems), default=len(checkpoints))
+
+    if not checkpoints:
+        status = "mismatch"
+    elif first_bad == len(checkpoints):
+        status = "resume"
+    elif first_bad > 0:
+        status = "partial"
+    else:
+        status = "mismatch"
+
+    unverified = [checkpoint.get("step") for checkpoint in checkpoints[:first_bad] if "files" not in checkpoint]
+    if status != "mismatch" and unverified:
+        status = "unverified"
+
+    resume_from = checkpoints[first_bad - 1] if first_bad > 0 else None
+    return {
+        "task": task.get("id"),
+        "status": status,
+        "checkpoints": len(checkpoints),
+        "files": len(latest),
+        "resume_from_step": resume_from["step"] if resume_from else None,
+        "unverified_steps": unverified,
+        "problems": [{"path": entry["path"], "reason": reason} for entry, reason in problems],
+    }
+
+
+class GitError(Exception):
+    pass
+
+
+def git(project_path: Path, *args: str, input_data: Optional[bytes] = None,
+        env: Optional[dict] = None) -> str:
+    """Run a git command in the project and return stdout."""
+    result = subprocess.run(
+        ["git", "-C", str(project_path), *args],
+        input=input_data, capture_output=True, env=env,
+    )
+    if result.returncode != 0:
+        raise GitError(result.stderr.decode("utf-8", errors="replace").strip())
+    return result.stdout.decode("utf-8", errors="replace").strip()
+
+
+def git_paths(project_path: Path, *args: str) -> List[str]:
+    """Run a git command with -z output and return the NUL-separated paths."""
+    return [path for path in git(project_path, *args).split("\0") if path]
+
+
+def create_snapshot(project_path: Path, task_id: str, scope: List[str]) -> dict:
+    """Record the current working tree and index as git objects.
+
+    The worktree commit holds tracked changes plus untracked (not ignored)
+    files inside `scope`; its first parent is the `git stash create` commit,
+    whose second parent is the index state. Nothing in the working tree or
+    index is modified.
+    """
+    head = git(project_path, "rev-parse", "HEAD")
+    stash = git(project_path, "stash", "create")
+    base = stash or head
+    index = git(project_path, "rev-parse", f"{stash}^2") if stash else head
+
+    untracked = git_paths(project_path, "ls-files", "-z", "--others", "--exclude-standard", "--", *scope)
+    worktree = base
+    if untracked:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            env = dict(os.environ, GIT_INDEX_FILE=os.path.join(tmp_dir, "index"))
+            git(project_path, "read-tree", base, env=env)
+            git(project_path, "update-index", "--add", "-z", "--stdin",
+                input_data="\0".join(untracked).encode("utf-8"), env=env)
+            tree = git(project_path, "write-tree", env=env)
+        worktree = git(project_path, "commit-tree", tree, "-p", base,
+                       "-m", f"harness snapshot {task_id}")
+
+    # A ref keeps the snapshot objects reachable until the task finishes
+    git(project_path, "update-ref", SNAPSHOT_REF_PREFIX + task_id, worktree)
+    return {
+        "head": head,
+        "worktree": worktree,
+        "base": base,
+        "index": index,
+        "scope": scope,
+        "untracked": len(untracked),
+        "created_at": now_iso(),
+    }
+
+
+def tree_entries(project_path: Path, commit: str, paths: List[str]) -> Dict[str, str]:
+    """Return {path: blob sha} for the given paths that exist in a commit.
+
+    The project subtree is listed once and filtered here, so the path list
+    never has to fit on the command line.
+    """
+    if not paths:
+        return {}
+    wanted = set(paths)
+    entries = {}
+    for line in git(project_path, "ls-tree", "-r", "-z", commit, "--", ".").split("\0"):
+        if line:
+            meta, path = line.split("\t", 1)
+            if path in wanted:
+                entries[path] = meta.split()[2]
+    return entries
+
+
+def git_with_paths(project_path: Path, paths: List[str], *args: str) -> str:
+    """Run a git command that takes its pathspecs NUL-separated on stdin."""
+    return git(project_path, "--literal-pathspecs", *args, "--pathspec-from-file=-", "--pathspec-file-nul",
+               input_data="\0".join(paths).encode("utf-8"))
+
+
+def changed_paths(project_path: Path, snapshot: dict) -> Tuple[List[str], List[str]]:
+    """Return (worktree paths, index paths) that differ from the snapshot.
+
+    Paths are relative to the project directory (which may be a subdirectory
+    of the repository) and limited to it.
+    """
+    worktree, base = snapshot["worktree"], snapshot["base"]
+    scope = snapshot.get("scope") or ["."]
+
+    snap_untracked = set(git_paths(project_path, "diff", "-z", "--relative", "--name-only", "--no-renames",
+                                   base, worktree))
+    tracked = set(git_paths(project_path, "diff", "-z", "--relative", "--name-only", "--no-renames", worktree))
+    changed = tracked - snap_untracked
+
+    # Untracked files: compare content for snapshotted ones, remove new ones
+    current_untracked = git_paths(project_path, "ls-files", "-z", "--others", "--exclude-standard", "--", *scope)
+    candidates = sorted((snap_untracked | set(current_untracked)) - HARNESS_FILES)
+    existing = [path for path in candidates if (project_path / path).is_file()]
+    current = {}
+    if existing:
+        # --stdin-paths resolves relative paths from the repository root
+        hashes = git(project_path, "hash-object", "--stdin-paths",
+                     input_data="\n".join(str(project_path / path) for path in existing).encode("utf-8")).split()
+        current = dict(zip(existing, hashes))
+    recorded = tree_entries(project_path, worktree, sorted(snap_untracked))
+    for path in candidates:
+        if current.get(path) != recorded.get(path):
+            changed.add(path)
+
+    staged = set(git_paths(project_path, "diff", "-z", "--relative", "--cached", "--name-only", "--no-renames",
+                           snapshot["index"]))
+    return sorted(changed - HARNESS_FILES), sorted(staged - HARNESS_FILES)
+
+
+def rollback_snapshot(project_path: Path, snapshot: dict) -> Tuple[List[str], List[str]]:
+    """Restore the paths changed since the snapshot; return (worktree, index) paths."""
+    if git(project_path, "rev-parse", "HEAD") != snapshot["head"]:
+        # Drop commits made during the task without touching files
+        git(project_path, "reset", "-q", "--soft", snapshot["head"])
+
+    worktree_paths, index_paths = changed_paths(project_path, snapshot)
+
+    in_index = tree_entries(project_path, snapshot["index"], index_paths)
+    restore = [path for path in index_paths if path in in_index]
+    unstage = [path for path in index_paths if path not in in_index]
+    if restore:
+        git_with_paths(project_path, restore, "restore", f"--source={snapshot['index']}", "--staged")
+    if unstage:
+        git(project_path, "update-index", "-z", "--force-remove", "--stdin",
+            input_data="\0".join(unstage).encode("utf-8"))
+
+    in_worktree = tree_entries(project_path, snapshot["worktree"], worktree_paths)
+    restore = [path for path in worktree_paths if path in in_worktree]
+    if restore:
+        git_with_paths(project_path, restore, "restore", f"--source={snapshot['worktree']}", "--worktree")
+    for path in worktree_paths:
+        if path not in in_worktree and (project_path / path).is_file():
+            (project_path / path).unlink()
+    return worktree_paths, index_paths
+
+
+def drop_snapshot(project_path: Path, task_id: str) -> None:
+    git(project_path, "update-ref", "-d", SNAPSHOT_REF_PREFIX + task_id)
+
+
+def update_task(project_path: Path, task_id: str, **fields) -> dict:
+    """Set fields on a task and save feature_list.json."""
+    feature_list = load_feature_list(project_path)
+    task = find_task(feature_list, task_id)
+    for key, value in fields.items():
+        if value is None:
+            task.pop(key, None)
+        else:
+            task[key] = value
+    save_feature_list(project_path, feature_list)
+    return task
+
+
+def cmd_checkpoint(args) -> int:
+    project_path = Path(args.project).resolve()
+    try:
+        checkpoint = add_checkpoint(project_path, args.task_id, args.step, args.total,
+                                    args.description, args.files)
+    except KeyError:
+        print(f"❌ Task not found: {args.task_id}")
+        return 1
+    print(f'[CHECKPOINT] [{args.task_id}] step={checkpoint["step"]}/{checkpoint["total"]} '
+          f'"{checkpoint["description"]}" files={len(checkpoint.get("files", []))}')
+    return 0
+
+
+def cmd_verify(args) -> int:
+    project_path = Path(args.project).resolve()
+    try:
+        task = find_task(load_feature_list(project_path), args.task_id)
+    except KeyError:
+        print(f"❌ Task not found: {args.task_id}")
+        return 1
+
+    result = verify_task(project_path, task)
+    if args.json:
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+    else:
+        line = f'[RECOVERY] [{result["task"]}] verify={result["status"]} files={result["files"]}'
+        if result["resume_from_step"] is not None:
+            line += f' resume_from_step={result["resume_from_step"]}'
+        print(line)
+        for problem in result["problems"]:
+            print(f'   ❌ {problem["path"]} ({problem["reason"]})')
+        if result["unverified_steps"]:
+            steps = ", ".join(str(step) for step in result["unverified_steps"])
+            print(f"   ⚠️  no file manifest for step(s) {steps}: check by hand")
+
+    return {
+        "resume": EXIT_RESUME,
+        "partial": EXIT_PARTIAL,
+        "unverified": EXIT_UNVERIFIED,
+    }.get(result["status"], EXIT_MISMATCH)
+
+
+def cmd_snapshot(args) -> int:
+    project_path = Path(args.project).resolve()
+    try:
+        task = find_task(load_feature_list(project_path), args.task_id)
+        snapshot = create_snapshot(project_path, args.task_id, args.scope)
+    except KeyError:
+        print(f"❌ Task not found: {args.task_id}")
+        return 1
+    except GitError as e:
+        print(f"❌ Snapshot failed: {e}")
+        return 1
+
+    update_task(project_path, args.task_id, snapshot=snapshot,
+                started_at_commit=task.get("started_at_commit") or snapshot["head"])
+    print(f'[CHECKPOINT] [{args.task_id}] snapshot={snapshot["worktree"][:7]} '
+          f'base={snapshot["head"][:7]} untracked={snapshot["untracked"]}')
+    return 0
+
+
+def cmd_rollback(args) -> int:
+    project_path = Path(args.project).resolve()
+    try:
+        task = find_task(load_feature_list(project_path), args.task_id)
+    except KeyError:
+        print(f"❌ Task not found: {args.task_id}")
+        return 1
+    snapshot = task.get("snapshot")
+    if not snapshot:
+        print(f"❌ No snapshot for {args.task_id}; fall back to git reset --hard <started_at_commit>")
+        return 1
+
+    try:
+        worktree_paths, index_paths = rollback_snapshot(project_path, snapshot)
+    except GitError as e:
+        print(f"❌ Rollback failed: {e}")
+        return 1
+    print(f'[ROLLBACK] [{args.task_id}] restored={len(set(worktree_paths) | set(index_paths))} '
+          f'base={snapshot["head"][:7]}')
+    for path in worktree_paths:
+        print(f"   ↩️  {path}")
+    return 0
+
+
+def cmd_drop_snapshot(args) -> int:
+    project_path = Path(args.project).resolve()
+    try:
+        update_task(project_path, args.task_id, snapshot=None)
+        drop_snapshot(project_path, args.task_id)
+    except KeyError:
+        print(f"❌ Task not found: {args.task_id}")
+        return 1
+    except GitError:
+        pass
+    print(f"[CHECKPOINT] [{args.task_id}] snapshot dropped")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Harness task helpers")
+    parser.add_argument("--project", default=".", help="Project path (default: current directory)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    checkpoint = subparsers.add_parser("checkpoint", help="Record a checkpoint with a file manifest")
+    checkpoint.add_argument("task_id")
+    checkpoint.add_argument("--step", type=int, required=True)
+    checkpoint.add_argument("--total", type=int, required=True)
+    checkpoint.add_argument("--description", required=True)
+    checkpoint.add_argument("--files", nargs="+", default=[], help="Files touched by this step")
+    checkpoint.set_defaults(func=cmd_checkpoint)
+
+    verify = subparsers.add_parser("verify", help="Verify checkpoint manifests against the working tree")
+    verify.add_argument("task_id")
+    verify.add_argument("--json", action="store_true")
+    verify.set_defaults(func=cmd_verify)
+
+    snapshot = subparsers.add_parser("snapshot", help="Snapshot working tree and index at task start")
+    snapshot.add_argument("task_id")
+    snapshot.add_argument("--scope", nargs="+", default=["."],
+                          help="Paths whose untracked files are captured (default: whole project)")
+    snapshot.set_defaults(func=cmd_snapshot)
+
+    rollback = subparsers.add_parser("rollback", help="Restore paths changed since the task snapshot")
+    rollback.add_argument("task_id")
+    rollback.set_defaults(func=cmd_rollback)
+
+    drop = subparsers.add_parser("drop-snapshot", help="Remove the task snapshot after completion")
+    drop.add_argument("task_id")
+    drop.set_defaults(func=cmd_drop_snapshot)
+
+    args = parser.parse_args()
+    sys.exit(args.func(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -6,11 +6,19 @@ Configures a long-running agent Harness system for any project type.
 Based on Anthropic's engineering blog: https://www.anthropic.com/engineering/effective-harnesses-for-long-running-agents
 
 Usage:
-    python setup_harness.py [project_path]
+    python setup_harness.py [project_path] [--spec FILE ...] [--profile[=FILE]] [--timings-json FILE]
 
 If project_path is not specified, uses current directory.
+
+Features are extracted from CLAUDE.md and every --spec file. Re-running merges
+into an existing feature_list.json by content-derived source key: new features
+are appended as pending, edited ones updated in place, removed ones flagged
+with source.stale, and task status/history is preserved.
 """
 
+import argparse
+import difflib
+import hashlib
 import json
 import os
 import re
@@ -18,10 +26,47 @@ import sys
 from datetime import datetime
 from pathlib import Path
 
+# Shared version-file/changelog detection lives with the release tooling
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent / "release-skills" / "scripts"))
+try:
+    from project_detect import scan_project
+except ImportError:  # harness installed without release-skills
+    scan_project = None
+
+# Shared span/counter instrumentation from the repo's scripts/ directory
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent / "scripts"))
+try:
+    import timing
+    from timing import count, span
+except ImportError:  # harness installed standalone: instrumentation is a no-op
+    from contextlib import nullcontext
+
+    timing = None
+
+    def span(name):
+        return nullcontext()
+
+    def count(name, n=1):
+        pass
+
+# feature_list.json load/save (with .bak fallback) shared with the task tool
+from harness import load_feature_list, save_feature_list
+
+
+def list_project_files(project_path: Path) -> set:
+    """Return the names of files in the project root (one directory scan)."""
+    if scan_project is not None:
+        return scan_project(project_path)["files"]
+    try:
+        return {entry.name for entry in os.scandir(project_path) if entry.is_file()}
+    except FileNotFoundError:
+        return set()
+
 
 def detect_project_type(project_path: Path) -> str:
     """Detect project type based on config files."""
-    if (project_path / "package.json").exists():
+    files = list_project_files(project_path)
+    if "package.json" in files:
         pkg = json.loads((project_path / "package.json").read_text())
         # Check for framework indicators
         deps = {**pkg.get("dependencies", {}), **pkg.get("devDependencies", {})}
@@ -36,17 +81,17 @@ def detect_project_type(project_path: Path) -> str:
         if "express" in deps or "fastify" in deps:
             return "node-backend"
         return "node"
-    if (project_path / "pyproject.toml").exists():
+    if "pyproject.toml" in files:
         return "python"
-    if (project_path / "setup.py").exists() or (project_path / "requirements.txt").exists():
+    if "setup.py" in files or "requirements.txt" in files:
         return "python"
-    if (project_path / "go.mod").exists():
+    if "go.mod" in files:
         return "go"
-    if (project_path / "Cargo.toml").exists():
+    if "Cargo.toml" in files:
         return "rust"
-    if (project_path / "pom.xml").exists():
+    if "pom.xml" in files:
         return "java-maven"
-    if (project_path / "build.gradle").exists():
+    if "build.gradle" in files:
         return "java-gradle"
     return "generic"
 
@@ -54,10 +99,11 @@ def detect_project_type(project_path: Path) -> str:
 def get_project_info(project_path: Path) -> dict:
     """Extract project name and version from config files."""
     info = {"name": project_path.name, "version": "0.0.0"}
+    files = list_project_files(project_path)
 
     # Try package.json (Node.js)
     pkg_json = project_path / "package.json"
-    if pkg_json.exists():
+    if "package.json" in files:
         try:
             pkg = json.loads(pkg_json.read_text())
             info["name"] = pkg.get("name", info["name"])
@@ -68,7 +114,7 @@ def get_project_info(project_path: Path) -> dict:
 
     # Try pyproject.toml (Python)
     pyproject = project_path / "pyproject.toml"
-    if pyproject.exists():
+    if "pyproject.toml" in files:
         try:
             content = pyproject.read_text()
             # Simple TOML parsing for name and version
@@ -84,7 +130,7 @@ def get_project_info(project_path: Path) -> dict:
 
     # Try go.mod (Go)
     go_mod = project_path / "go.mod"
-    if go_mod.exists():
+    if "go.mod" in files:
         try:
             content = go_mod.read_text()
             module_match = re.search(r"^module\s+(\S+)", content, re.MULTILINE)
@@ -97,9 +143,242 @@ def get_project_info(project_path: Path) -> dict:
     return info
 
 
-def create_feature_list(project_path: Path, project_info: dict, project_type: str) -> Path:
-    """Create feature_list.json based on existing codebase analysis (v2 format)."""
+# Bullets mentioning these describe the repo layout rather than a feature
+META_KEYWORDS = ["目录", "结构", "overview", "目录结构", "directory"]
+# Sections written by update_claude_md(); skipped so re-runs don't import them
+HARNESS_HEADINGS = ("长运行代理 Harness", "Long-Running Agent Harness")
+MIN_FEATURE_LENGTH = 6
+# A new bullet this similar to a vanished one in the same section is an edit of it
+EDIT_SIMILARITY = 0.6
+
+HEADING_RE = re.compile(r"^(#{1,6})\s+(.*?)[\s#]*$")
+BULLET_RE = re.compile(r"^\s*(?:[-*+]|\d+[.)])\s+(?:\[[ xX]\]\s+)?(.*\S)")
+LINK_RE = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+MARKUP_RE = re.compile(r"[`*_~]+")
+
+
+def normalize_feature(text: str) -> str:
+    """Reduce a bullet to the form used for dedup: no markup, case or punctuation noise."""
+    text = MARKUP_RE.sub("", LINK_RE.sub(r"\1", text)).lower()
+    text = re.sub(r"[\s\W]+", " ", text)
+    return text.strip()
+
+
+def feature_key(text: str) -> str:
+    """Stable content-derived key used to merge re-runs into an existing feature list."""
+    return hashlib.sha1(normalize_feature(text).encode("utf-8")).hexdigest()[:12]
+
+
+def iter_spec_features(spec_path: Path):
+    """Stream bullets from a markdown spec, yielding (text, [(level, heading), ...]).
+
+    Lines are read one at a time; fenced code blocks and the Harness section
+    added by update_claude_md() are skipped.
+    """
+    headings = []
+    in_code = False
+    with open(spec_path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            count("spec_lines")
+            stripped = line.strip()
+            if stripped.startswith(("```", "~~~")):
+                in_code = not in_code
+                continue
+            if in_code:
+                continue
+
+            match = HEADING_RE.match(line)
+            if match:
+                level = len(match.group(1))
+                while headings and headings[-1][0] >= level:
+                    headings.pop()
+                headings.append((level, match.group(2)))
+                continue
+
+            match = BULLET_RE.match(line)
+            if not match:
+                continue
+            if any(title in heading for _, heading in headings for title in HARNESS_HEADINGS):
+                continue
+            text = match.group(1).strip()
+            if len(text) < MIN_FEATURE_LENGTH:
+                continue
+            if any(kw in text.lower() for kw in META_KEYWORDS):
+                continue
+            yield text, list(headings)
+
+
+def heading_category(headings: list) -> str:
+    """Use the outermost section below the document title (H1) as the category."""
+    for level, heading in headings:
+        if level > 1:
+            return heading
+    return headings[0][1] if headings else "existing"
+
+
+def extract_features(project_path: Path, spec_files: list) -> tuple:
+    """Collect unique features from CLAUDE.md and extra spec files, in document order.
+
+    Returns (features, names of the source files that were read).
+    """
+    sources = [project_path / "CLAUDE.md"] + list(spec_files)
+    seen = set()
+    features = []
+    scanned = set()
+    for spec_path in sources:
+        if not spec_path.is_file():
+            continue
+        try:
+            source_name = spec_path.resolve().relative_to(project_path).as_posix()
+        except ValueError:
+            source_name = str(spec_path)
+        scanned.add(source_name)
+        with span("extract"):
+            for text, headings in iter_spec_features(spec_path):
+                key = feature_key(text)
+                if key in seen:
+                    count("duplicates_skipped")
+                    continue
+                seen.add(key)
+                features.append({
+                    "key": key,
+                    "title": text,
+                    "category": heading_category(headings),
+                    "source": {
+                        "key": key,
+                        "file": source_name,
+                        "section": " > ".join(heading for _, heading in headings),
+                    },
+                })
+    count("features_extracted", len(features))
+    return features, scanned
+
+
+def new_feature_entry(feature_id: int, title: str, category: str, status: str, now: str,
+                      priority: str = "medium") -> dict:
+    """Build a v2 feature entry with default execution fields."""
+    return {
+        "id": f"F{feature_id:03d}",
+        "title": title,
+        "category": category,
+        "status": status,
+        "priority": priority,
+        "depends_on": [],
+        "attempts": 1 if status == "completed" else 0,
+        "max_attempts": 3,
+        "started_at_commit": None,
+        "validation": {
+            "command": None,
+            "timeout_seconds": 120
+        },
+        "on_failure": {
+            "cleanup": None
+        },
+        "error_log": [],
+        "checkpoints": [],
+        "completed_at": now if status == "completed" else None,
+        "created_at": now,
+        "blockers": []
+    }
+
+
+def merge_features(feature_list: dict, extracted: list, now: str, scanned: set,
+                   initial: bool = False) -> tuple:
+    """Merge extracted features by source key; returns (added, updated, stale).
+
+    Existing entries keep their id, status and execution history; only the
+    title, category and source of a changed feature are rewritten. Entries
+    from older setups without a source key are matched by normalized title.
+    A new bullet that closely resembles a vanished one in the same file and
+    section is treated as an edit of it. Entries whose bullet is gone from a
+    scanned file are flagged with `source.stale` rather than deleted.
+
+    New features are `pending`, except bullets from CLAUDE.md on the initial
+    import, which describe what the project already does.
+    """
+    features = feature_list["features"]
+    by_key = {}
+    for feature in features:
+        key = (feature.get("source") or {}).get("key") or feature_key(feature.get("title", ""))
+        by_key.setdefault(key, feature)
+
+    numbers = [int(f["id"][1:]) for f in features if re.fullmatch(r"F\d+", str(f.get("id", "")))]
+    next_id = max(numbers, default=0) + 1
+
+    def apply(feature, item):
+        changes = {name: item[name] for name in ("title", "category", "source") if feature.get(name) != item[name]}
+        feature.update(changes)
+        return bool(changes)
+
+    added = updated = 0
+    matched = set()
+    unmatched = []
+    for item in extracted:
+        feature = by_key.get(item["key"])
+        if feature is None:
+            unmatched.append(item)
+            continue
+        matched.add(id(feature))
+        updated += apply(feature, item)
+
+    orphans = [f for f in features
+               if id(f) not in matched and (f.get("source") or {}).get("file") in scanned]
+    for item in unmatched:
+        normalized = normalize_feature(item["title"])
+        best, best_ratio = None, EDIT_SIMILARITY
+        for feature in orphans:
+            if (feature["source"].get("file"), feature["source"].get("section")) != \
+                    (item["source"]["file"], item["source"]["section"]):
+                continue
+            ratio = difflib.SequenceMatcher(None, normalize_feature(feature["title"]), normalized).ratio()
+            if ratio >= best_ratio:
+                best, best_ratio = feature, ratio
+        if best is not None:
+            orphans.remove(best)
+            updated += apply(best, item)
+            continue
+
+        status = "completed" if initial and item["source"]["file"] == "CLAUDE.md" else "pending"
+        entry = new_feature_entry(next_id, item["title"], item["category"], status, now)
+        entry["source"] = item["source"]
+        features.append(entry)
+        next_id += 1
+        added += 1
+
+    stale = 0
+    for feature in orphans:
+        if not feature["source"].get("stale"):
+            feature["source"]["stale"] = True
+            stale += 1
+    return added, updated, stale
+
+
+def create_feature_list(project_path: Path, project_info: dict, project_type: str,
+                        spec_files: list = ()) -> Path:
+    """Create or update feature_list.json from CLAUDE.md and spec files (v2 format).
+
+    An existing feature_list.json is merged in place: new features are
+    appended and changed ones updated, everything else is left untouched.
+    """
     now = datetime.now().strftime("%Y-%m-%dT%H:%M:%SZ")
+    output_path = project_path / "feature_list.json"
+    extracted, scanned = extract_features(project_path, spec_files)
+
+    if output_path.exists():
+        with span("read"):
+            feature_list = load_feature_list(project_path)
+        added, updated, stale = merge_features(feature_list, extracted, now, scanned)
+        count("features_added", added)
+        count("features_updated", updated)
+        count("features_stale", stale)
+        if not (added or updated or stale) and feature_list.get("project_version") == project_info["version"]:
+            return output_path
+        feature_list["project_version"] = project_info["version"]
+        with span("write"):
+            save_feature_list(project_path, feature_list)
+            count("files_written", 2)
+        return output_path
+
     feature_list = {
         "version": 2,
         "created": now,
@@ -113,95 +392,25 @@ def create_feature_list(project_path: Path, project_info: dict, project_type: st
         "session_count": 0,
         "last_session": None
     }
+    added, _, _ = merge_features(feature_list, extracted, now, scanned, initial=True)
+    count("features_added", added)
 
-    # Analyze existing features from CLAUDE.md if it exists
-    claude_md = project_path / "CLAUDE.md"
-    existing_features = []
-
-    if claude_md.exists():
-        content = claude_md.read_text()
-        # Extract feature descriptions from markdown
-        # Look for bullet points, headers that might indicate features
-        lines = content.split("\n")
-        for line in lines:
-            line = line.strip()
-            if line.startswith("- ") or line.startswith("* "):
-                # Clean up and add as potential feature
-                feature_text = line[2:].strip()
-                if len(feature_text) > 5 and len(feature_text) < 100:
-                    existing_features.append(feature_text)
-
-    # Generate feature entries (v2 format)
-    feature_id = 1
-    seen = set()
-
-    for feature_text in existing_features[:20]:  # Limit to 20 features
-        if feature_text in seen:
-            continue
-        seen.add(feature_text)
+    # Add placeholder for future features
+    if len(feature_list["features"]) < 5:
+        feature_list["features"].append(
+            new_feature_entry(len(feature_list["features"]) + 1, "待规划功能", "future", "pending", now, "low"))
 
-        # Skip if it looks like a meta description
-        if any(kw in feature_text.lower() for kw in ["目录", "结构", "overview", "目录结构", "directory"]):
-            continue
+    with span("json_encode"):
+        content = json.dumps(feature_list, indent=2, ensure_ascii=False)
 
-        feature_list["features"].append({
-            "id": f"F{feature_id:03d}",
-            "title": feature_text,
-            "category": "existing",
-            "status": "completed",
-            "priority": "medium",
-            "depends_on": [],
-            "attempts": 1,
-            "max_attempts": 3,
-            "started_at_commit": None,
-            "validation": {
-                "command": None,
-                "timeout_seconds": 120
-            },
-            "on_failure": {
-                "cleanup": None
-            },
-            "error_log": [],
-            "checkpoints": [],
-            "completed_at": now,
-            "created_at": now,
-            "blockers": []
-        })
-        feature_id += 1
+    with span("write"):
+        output_path.write_text(content)
 
-    # Add placeholder for future features
-    if len(feature_list["features"]) < 5:
-        feature_list["features"].append({
-            "id": f"F{feature_id:03d}",
-            "title": "待规划功能",
-            "category": "future",
-            "status": "pending",
-            "priority": "low",
-            "depends_on": [],
-            "attempts": 0,
-            "max_attempts": 3,
-            "started_at_commit": None,
-            "validation": {
-                "command": None,
-                "timeout_seconds": 120
-            },
-            "on_failure": {
-                "cleanup": None
-            },
-            "error_log": [],
-            "checkpoints": [],
-            "completed_at": None,
-            "created_at": now,
-            "blockers": []
-        })
+        # Create backup for JSON corruption recovery
+        backup_path = project_path / "feature_list.json.bak"
+        backup_path.write_text(content)
+        count("files_written", 2)
 
-    output_path = project_path / "feature_list.json"
-    output_path.write_text(json.dumps(feature_list, indent=2, ensure_ascii=False))
-    
-    # Create backup for JSON corruption recovery
-    backup_path = project_path / "feature_list.json.bak"
-    backup_path.write_text(json.dumps(feature_list, indent=2, ensure_ascii=False))
-    
     return output_path
 
 
@@ -248,10 +457,20 @@ def create_progress_file(project_path: Path, project_info: dict) -> Path:
 """
 
     output_path = project_path / "claude-progress.txt"
-    output_path.write_text(content)
+    with span("write"):
+        output_path.write_text(content)
+        count("files_written")
     return output_path
 
 
+def append_progress_entry(progress_path: Path, message: str) -> None:
+    """Append a single SESSION-0 line to an existing claude-progress.txt."""
+    now = datetime.now().strftime("%Y-%m-%dT%H:%M:%SZ")
+    with span("write"), open(progress_path, "a") as f:
+        f.write(f"[{now}] [SESSION-0] {message}\n")
+        count("files_written")
+
+
 def get_init_sh_content(project_type: str, project_info: dict) -> str:
     """Generate init.sh content based on project type."""
 
@@ -532,8 +751,10 @@ def create_init_sh(project_path: Path, project_type: str, project_info: dict) ->
     """Create init.sh script based on project type."""
     content = get_init_sh_content(project_type, project_info)
     output_path = project_path / "init.sh"
-    output_path.write_text(content)
-    os.chmod(output_path, 0o755)
+    with span("write"):
+        output_path.write_text(content)
+        os.chmod(output_path, 0o755)
+        count("files_written")
     return output_path
 
 
@@ -553,7 +774,9 @@ def create_prompts_directory(project_path: Path, project_info: dict) -> Path:
             content = source.read_text()
             # Replace placeholder with actual project name
             content = content.replace("Project Name", project_info["name"].title())
-            (prompts_dir / prompt_file).write_text(content)
+            with span("write"):
+                (prompts_dir / prompt_file).write_text(content)
+                count("files_written")
 
     return prompts_dir
 
@@ -642,16 +865,29 @@ def update_claude_md(project_path: Path, project_type: str, project_info: dict)
 
     addition = get_claude_md_addition(project_type, project_info)
     new_content = content.rstrip() + "\n" + addition
-    claude_md.write_text(new_content)
+    with span("write"):
+        claude_md.write_text(new_content)
+        count("files_written")
     return True
 
 
 def main():
+    if timing is not None:
+        timing.init_from_argv()
+
+    parser = argparse.ArgumentParser(description="Configure the Harness system for a project")
+    parser.add_argument("project_path", nargs="?", help="project directory (default: current directory)")
+    parser.add_argument("--spec", action="append", default=[], metavar="FILE",
+                        help="extra markdown spec to extract features from (repeatable)")
+    args = parser.parse_args()
+
     # Determine project path
-    if len(sys.argv) > 1:
-        project_path = Path(sys.argv[1]).resolve()
-    else:
-        project_path = Path.cwd()
+    project_path = Path(args.project_path).resolve() if args.project_path else Path.cwd()
+    spec_files = [Path(spec).resolve() for spec in args.spec]
+    missing = [spec for spec in spec_files if not spec.is_file()]
+    if missing:
+        print(f"❌ 规格文件不存在: {', '.join(map(str, missing))}")
+        sys.exit(1)
 
     if not project_path.exists():
         print(f"❌ 项目路径不存在: {project_path}")
@@ -661,11 +897,13 @@ def main():
     print("")
 
     # Detect project type
-    project_type = detect_project_type(project_path)
+    with span("detect"):
+        project_type = detect_project_type(project_path)
     print(f"📋 检测到项目类型: {project_type}")
 
     # Get project info
-    project_info = get_project_info(project_path)
+    with span("detect"):
+        project_info = get_project_info(project_path)
     print(f"📋 项目: {project_info['name']} v{project_info['version']}")
     print("")
 
@@ -673,25 +911,42 @@ def main():
     print("📦 创建 Harness 文件...")
 
     # 1. feature_list.json
-    feature_list_path = create_feature_list(project_path, project_info, project_type)
-    print(f"   ✅ {feature_list_path.name}")
-
-    # 2. claude-progress.txt
-    progress_path = create_progress_file(project_path, project_info)
-    print(f"   ✅ {progress_path.name}")
-
-    # 3. init.sh
-    init_sh_path = create_init_sh(project_path, project_type, project_info)
-    print(f"   ✅ {init_sh_path.name}")
+    merging = (project_path / "feature_list.json").exists()
+    with span("feature_list"):
+        feature_list_path = create_feature_list(project_path, project_info, project_type, spec_files)
+    print(f"   ✅ {feature_list_path.name}{' (已合并)' if merging else ''}")
+
+    # 2. claude-progress.txt (append-only: never rewritten on re-runs)
+    progress_path = project_path / "claude-progress.txt"
+    if progress_path.exists():
+        with span("progress"):
+            append_progress_entry(progress_path, f"INIT Harness setup re-run for project {project_path}")
+        print(f"   ✅ {progress_path.name} (已追加)")
+    else:
+        with span("progress"):
+            progress_path = create_progress_file(project_path, project_info)
+        print(f"   ✅ {progress_path.name}")
+
+    # 3. init.sh (may have been customized; only created when missing)
+    init_sh_path = project_path / "init.sh"
+    if init_sh_path.exists():
+        print(f"   ⚠️  {init_sh_path.name} (已存在，跳过)")
+    else:
+        with span("init_sh"):
+            init_sh_path = create_init_sh(project_path, project_type, project_info)
+        print(f"   ✅ {init_sh_path.name}")
 
     # 4. .claude/prompts/
-    prompts_dir = create_prompts_directory(project_path, project_info)
+    with span("prompts"):
+        prompts_dir = create_prompts_directory(project_path, project_info)
     print(f"   ✅ .claude/prompts/")
 
     # 5. Update CLAUDE.md
     claude_md = project_path / "CLAUDE.md"
     if claude_md.exists():
-        if update_claude_md(project_path, project_type, project_info):
+        with span("claude_md"):
+            updated = update_claude_md(project_path, project_type, project_info)
+        if updated:
             print(f"   ✅ CLAUDE.md (已更新)")
         else:
             print(f"   ⚠️  CLAUDE.md (Harness 章节已存在)")
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Release Changelog Engine
+
+Streams `git log` since the last tag in a single pass, classifies conventional
+commits, computes the SemVer bump and renders a changelog section for every
+detected `CHANGELOG*.md` language file (Steps 3-5 of the release workflow).
+
+Memory stays constant regardless of history length: only per-type counters and
+the first `--max-entries` descriptions of each section are kept.
+
+Usage:
+    python changelog.py [--repo PATH] [--from TAG] [--version X.Y.Z]
+                        [--major | --minor | --patch] [--max-entries N]
+                        [--write] [--json]
+
+Without --write the rendered sections are only printed (dry run).
+"""
+
+import argparse
+import json
+import re
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from project_detect import detect_version, scan_project
+
+# One record per commit: hash, author, subject, body
+FIELD_SEP = "\x1f"
+RECORD_SEP = "\x1e"
+LOG_FORMAT = "%H%x1f%an%x1f%s%x1f%b%x1e"
+
+CONVENTIONAL_RE = re.compile(
+    r"^(?P<type>[a-zA-Z]+)(?:\((?P<scope>[^)]*)\))?(?P<bang>!)?:\s*(?P<desc>.+)$"
+)
+BREAKING_RE = re.compile(r"^BREAKING[ -]CHANGE:\s*(?P<desc>.+)$", re.MULTILINE)
+SEMVER_RE = re.compile(r"^(\d+)\.(\d+)\.(\d+)(?:-[0-9A-Za-z.-]+)?(?:\+[0-9A-Za-z.-]+)?$")
+
+# Rendered order; types missing here (chore, test, style, ci, build) are skipped
+SECTION_ORDER = ["breaking", "feat", "fix", "perf", "refactor", "docs"]
+
+SECTION_TITLES = {
+    "en": {"feat": "Features", "fix": "Fixes", "docs": "Documentation", "refactor": "Refactor",
+           "perf": "Performance", "breaking": "Breaking Changes"},
+    "zh": {"feat": "新功能", "fix": "修复", "docs": "文档", "refactor": "重构",
+           "perf": "性能优化", "breaking": "破坏性变更"},
+    "ja": {"feat": "新機能", "fix": "修正", "docs": "ドキュメント", "refactor": "リファクタリング",
+           "perf": "パフォーマンス", "breaking": "破壊的変更"},
+    "ko": {"feat": "새로운 기능", "fix": "수정", "docs": "문서", "refactor": "리팩토링",
+           "perf": "성능", "breaking": "주요 변경사항"},
+    "de": {"feat": "Funktionen", "fix": "Fehlerbehebungen", "docs": "Dokumentation",
+           "refactor": "Refactoring", "perf": "Leistung", "breaking": "Breaking Changes"},
+    "fr": {"feat": "Fonctionnalités", "fix": "Corrections", "docs": "Documentation",
+           "refactor": "Refactorisation", "perf": "Performance", "breaking": "Changements majeurs"},
+    "es": {"feat": "Características", "fix": "Correcciones", "docs": "Documentación",
+           "refactor": "Refactorización", "perf": "Rendimiento", "breaking": "Cambios importantes"},
+}
+
+class GitError(Exception):
+    """A git command failed (bad ref, not a repository, ...)."""
+
+
+def run_git(repo: Path, *args: str) -> str:
+    """Run a git command and return stripped stdout ("" on failure)."""
+    result = subprocess.run(
+        ["git", "-C", str(repo), *args],
+        capture_output=True, text=True, encoding="utf-8", errors="replace",
+    )
+    if result.returncode != 0:
+        return ""
+    return result.stdout.strip()
+
+
+def find_last_tag(repo: Path) -> Optional[str]:
+    """Return the highest version tag, or None when the repo has no tags."""
+    tags = run_git(repo, "tag", "--sort=-v:refname")
+    return tags.splitlines()[0] if tags else None
+
+
+def iter_commits(repo: Path, rev_range: str) -> Iterator[Tuple[str, str, str, str]]:
+    """Yield (hash, author, subject, body) tuples streamed from `git log`."""
+    proc = subprocess.Popen(
+        ["git", "-C", str(repo), "log", "--no-merges", f"--format={LOG_FORMAT}", rev_range],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        text=True, encoding="utf-8", errors="replace",
+    )
+    buffer = ""
+    finished = False
+    try:
+        for chunk in iter(lambda: proc.stdout.read(65536), ""):
+            buffer += chunk
+            *records, buffer = buffer.split(RECORD_SEP)
+            for record in records:
+                fields = record.lstrip("\n").split(FIELD_SEP, 3)
+                if len(fields) == 4:
+                    yield fields[0], fields[1], fields[2], fields[3].strip()
+        finished = True
+    finally:
+        proc.stdout.close()
+        stderr = proc.stderr.read()
+        proc.stderr.close()
+        proc.wait()
+    # Only a fully consumed log is checked; closing early may SIGPIPE git
+    if finished and proc.returncode != 0:
+        raise GitError(stderr.strip() or f"git log {rev_range} failed ({proc.returncode})")
+
+
+def classify_commit(subject: str, body: str) -> Tuple[Optional[str], str, Optional[str]]:
+    """Return (type, description, breaking_note) for a commit message.
+
+    breaking_note is None for non-breaking commits; otherwise it is the
+    `BREAKING CHANGE:` footer text, falling back to the description.
+    """
+    breaking_match = BREAKING_RE.search(body)
+    footer = breaking_match.group("desc").strip() if breaking_match else None
+    if subject.startswith("BREAKING CHANGE"):
+        desc = subject.split(":", 1)[-1].strip() or subject
+        return "breaking", desc, desc
+
+    match = CONVENTIONAL_RE.match(subject)
+    if not match:
+        return None, subject, footer
+
+    commit_type = match.group("type").lower()
+    desc = match.group("desc").strip()
+    scope = match.group("scope")
+    if scope:
+        desc = f"**{scope}**: {desc}"
+    if match.group("bang") and not footer:
+        footer = desc
+    return commit_type, desc, footer
+
+
+class ChangeSummary:
+    """Aggregated commit counts plus a bounded number of entries per section."""
+
+    def __init__(self, max_entries: int = 50):
+        self.max_entries = max_entries
+        self.total = 0
+        self.counts: Dict[str, int] = {}
+        self.entries: Dict[str, List[str]] = {section: [] for section in SECTION_ORDER}
+
+    def add(self, subject: str, body: str) -> None:
+        commit_type, desc, breaking = classify_commit(subject, body)
+        self.total += 1
+        key = commit_type or "other"
+        self.counts[key] = self.counts.get(key, 0) + 1
+        if breaking and commit_type != "breaking":
+            self.counts["breaking"] = self.counts.get("breaking", 0) + 1
+            self._keep("breaking", breaking)
+        if key in self.entries:
+            self._keep(key, desc)
+
+    def _keep(self, section: str, desc: str) -> None:
+        if len(self.entries[section]) < self.max_entries:
+            self.entries[section].append(desc)
+
+    def bump_kind(self) -> str:
+        """Apply the workflow's bump rules: breaking > feat > patch."""
+        if self.counts.get("breaking"):
+            return "major"
+        if self.counts.get("feat"):
+            return "minor"
+        return "patch"
+
+
+def collect_changes(repo: Path, since: Optional[str], max_entries: int = 50) -> ChangeSummary:
+    """Stream commits after `since` (or the whole history) into a summary.
+
+    Raises GitError when `since` does not name a commit or `git log` fails.
+    """
+    summary = ChangeSummary(max_entries)
+    if since and not run_git(repo, "rev-parse", "--verify", "--quiet", f"{since}^{{commit}}"):
+        raise GitError(f"Unknown tag or commit: {since}")
+    rev_range = f"{since}..HEAD" if since else "HEAD"
+    for _, _, subject, body in iter_commits(repo, rev_range):
+        summary.add(subject, body)
+    return summary
+
+
+def bump_version(current: str, kind: str) -> str:
+    """Bump a SemVer string; pre-release and build metadata are dropped."""
+    match = SEMVER_RE.match(current.lstrip("v"))
+    if not match:
+        raise ValueError(f"Not a SemVer version: {current}")
+    major, minor, patch = (int(part) for part in match.groups())
+    if kind == "major":
+        return f"{major + 1}.0.0"
+    if kind == "minor":
+        return f"{major}.{minor + 1}.0"
+    return f"{major}.{minor}.{patch + 1}"
+
+
+def find_changelogs(repo: Path) -> List[Tuple[Path, str]]:
+    """Return (path, language) for every root changelog file of the repo."""
+    return [(repo / rel_path, lang) for rel_path, lang in scan_project(repo)["changelogs"]]
+
+
+def render_section(summary: ChangeSummary, version: str, lang: str, date: str) -> str:
+    """Render one `## VERSION - DATE` block; empty sections are omitted."""
+    titles = SECTION_TITLES.get(lang, SECTION_TITLES["en"])
+    lines = [f"## {version} - {date}", ""]
+    for section in SECTION_ORDER:
+        entries = summary.entries[section]
+        if not entries:
+            continue
+        lines.append(f"### {titles[section]}")
+        lines.append("")
+        lines.extend(f"- {entry}" for entry in entries)
+        hidden = summary.counts.get(section, 0) - len(entries)
+        if hidden > 0:
+            lines.append(f"- … (+{hidden})")
+        lines.append("")
+    return "\n".join(lines)
+
+
+def insert_section(changelog: Path, section: str) -> None:
+    """Insert a rendered section at the file head, after a leading `# ` title."""
+    content = changelog.read_text(encoding="utf-8") if changelog.exists() else ""
+    lines = content.splitlines(keepends=True)
+    head = ""
+    if lines and lines[0].startswith("# "):
+        head = lines.pop(0)
+        while lines and not lines[0].strip():
+            lines.pop(0)
+        head += "\n"
+    changelog.write_text(head + section + "\n" + "".join(lines), encoding="utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate changelog sections since the last tag")
+    parser.add_argument("--repo", default=".", help="Repository path (default: current directory)")
+    parser.add_argument("--from", dest="since", help="Start tag/commit (default: last tag)")
+    parser.add_argument("--version", help="Explicit release version")
+    bump = parser.add_mutually_exclusive_group()
+    bump.add_argument("--major", dest="bump", action="store_const", const="major")
+    bump.add_argument("--minor", dest="bump", action="store_const", const="minor")
+    bump.add_argument("--patch", dest="bump", action="store_const", const="patch")
+    parser.add_argument("--max-entries", type=int, default=50, help="Entries kept per section")
+    parser.add_argument("--write", action="store_true", help="Insert sections into changelog files")
+    parser.add_argument("--json", action="store_true", help="Print a JSON summary instead")
+    args = parser.parse_args()
+
+    repo = Path(args.repo).resolve()
+    since = args.since or find_last_tag(repo)
+    try:
+        summary = collect_changes(repo, since, args.max_entries)
+    except GitError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    version_file, current = detect_version(repo)
+    if not current or not SEMVER_RE.match(current):
+        current = since.lstrip("v") if since and SEMVER_RE.match(since.lstrip("v")) else "0.0.0"
+    kind = args.bump or summary.bump_kind()
+    if args.version:
+        if not SEMVER_RE.match(args.version):
+            print(f"❌ Invalid SemVer version: {args.version}")
+            sys.exit(1)
+        version = args.version
+        # Report the bump the explicit version actually makes
+        old, new = SEMVER_RE.match(current.lstrip("v")).groups(), SEMVER_RE.match(version).groups()
+        kind = "major" if new[0] != old[0] else "minor" if new[1] != old[1] else "patch"
+    else:
+        version = bump_version(current, kind)
+
+    date = datetime.now().strftime("%Y-%m-%d")
+    changelogs = find_changelogs(repo) or [(repo / "CHANGELOG.md", "en")]
+
+    if args.json:
+        print(json.dumps({
+            "since": since,
+            "version_file": version_file,
+            "current": current,
+            "bump": kind,
+            "version": version,
+            "commits": summary.total,
+            "counts": summary.counts,
+            "changelogs": [{"path": path.name, "lang": lang} for path, lang in changelogs],
+        }, indent=2, ensure_ascii=False))
+        return
+
+    if version_file:
+        print(f"📋 Version file: {version_file}")
+    print(f"📋 Commits since {since or 'repository start'}: {summary.total}")
+    print(f"📋 Version: {current} → {version} ({kind})")
+    if summary.counts.get("breaking") and kind != "major":
+        print("⚠️  Breaking changes detected. Consider major version bump (--major flag).")
+    print("")
+
+    if args.write and summary.total == 0:
+        print(f"❌ No commits since {since or 'repository start'}; refusing to write an empty release section.")
+        sys.exit(1)
+
+    for path, lang in changelogs:
+        section = render_section(summary, version, lang, date)
+        if args.write:
+            insert_section(path, section)
+            print(f"   ✅ {path.name} ({lang})")
+        else:
+            print(f"=== {path.name} ({lang}) ===")
+            print(section)
+
+    if not args.write:
+        print("No changes made. Run with --write to update changelogs.")
+
+
+if __name__ == "__main__":
+    main()
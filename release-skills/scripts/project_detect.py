@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Project Detection
+
+Shared version-file and changelog detection for the release tooling and the
+harness setup script. The project root is read with a single `os.scandir`
+(plus `docs/releases`, `documents/updates` and `.claude-plugin` when present)
+and every entry is classified in that pass. Results are cached per directory
+mtime, so repeated calls in one process cost a few `stat` calls.
+
+Usage:
+    python project_detect.py [project_path] [--json]
+"""
+
+import argparse
+import json
+import os
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Version files in release workflow priority order
+VERSION_FILES = [
+    "package.json",
+    "pyproject.toml",
+    "setup.py",
+    "Cargo.toml",
+    "manifest.json",
+    "plugin.json",
+    "marketplace.json",
+    ".claude-plugin/marketplace.json",
+    "VERSION",
+    "version.txt",
+]
+
+CHANGELOG_PREFIXES = ("CHANGELOG", "HISTORY", "CHANGES")
+RELEASE_NOTE_DIRS = ("docs/releases", "documents/updates")
+SUB_DIRS = RELEASE_NOTE_DIRS + (".claude-plugin",)
+
+# Uppercase filename suffixes (CHANGELOG_CN.md) mapped to language codes
+LANG_ALIASES = {"CN": "zh", "JP": "ja", "KR": "ko", "DE": "de", "FR": "fr", "ES": "es", "EN": "en"}
+LANG_SUFFIX_RE = re.compile(r"^[A-Za-z]+(?:[._](?P<suffix>[A-Za-z]{2}(?:-[A-Za-z]{2})?))?$")
+
+_cache: Dict[str, Tuple[tuple, dict]] = {}
+
+
+def changelog_language(filename: str) -> str:
+    """Map a changelog filename to its language code (see Language Detection Rules)."""
+    stem = filename[:-3] if filename.lower().endswith(".md") else filename
+    match = LANG_SUFFIX_RE.match(stem)
+    if not match or not match.group("suffix"):
+        return "en"
+    suffix = match.group("suffix")
+    if suffix.isupper() and suffix in LANG_ALIASES:
+        return LANG_ALIASES[suffix]
+    return suffix.split("-")[0].lower()
+
+
+def _scan_dir(path: str) -> Tuple[float, List[str]]:
+    """Return (mtime, file names) of a directory, or (0, []) if missing."""
+    try:
+        mtime = os.stat(path).st_mtime
+        with os.scandir(path) as entries:
+            return mtime, [entry.name for entry in entries if entry.is_file()]
+    except (FileNotFoundError, NotADirectoryError):
+        return 0.0, []
+
+
+def _dir_mtimes(root: str) -> tuple:
+    mtimes = []
+    for sub in ("",) + SUB_DIRS:
+        try:
+            mtimes.append(os.stat(os.path.join(root, sub)).st_mtime)
+        except OSError:
+            mtimes.append(0.0)
+    return tuple(mtimes)
+
+
+def _copy_scan(result: dict) -> dict:
+    """Give each caller its own containers so the cached scan cannot be mutated."""
+    return {key: set(value) if isinstance(value, set) else list(value) for key, value in result.items()}
+
+
+def scan_project(project_path) -> dict:
+    """Classify version files, changelogs and marker files of a project.
+
+    Returns a dict with:
+        files:         set of relative file paths seen in the scan
+        version_files: relative paths found, in VERSION_FILES priority order
+        changelogs:    [(relative path, language)] for root CHANGELOG/HISTORY/CHANGES files
+        release_notes: [(relative path, language)] for docs/releases and documents/updates
+    """
+    root = os.path.abspath(str(project_path))
+    mtimes = _dir_mtimes(root)
+    cached = _cache.get(root)
+    if cached and cached[0] == mtimes:
+        return _copy_scan(cached[1])
+
+    files = set()
+    changelogs = []
+    root_dirs = set()
+    try:
+        with os.scandir(root) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    root_dirs.add(entry.name)
+                    continue
+                files.add(entry.name)
+                if entry.name.endswith(".md") and entry.name.startswith(CHANGELOG_PREFIXES):
+                    changelogs.append((entry.name, changelog_language(entry.name)))
+    except FileNotFoundError:
+        pass
+
+    release_notes = []
+    for sub in SUB_DIRS:
+        if sub.split("/")[0] not in root_dirs:
+            continue
+        _, names = _scan_dir(os.path.join(root, sub))
+        for name in names:
+            rel = f"{sub}/{name}"
+            files.add(rel)
+            if sub in RELEASE_NOTE_DIRS and name.endswith(".md"):
+                release_notes.append((rel, changelog_language(name)))
+
+    result = {
+        "files": files,
+        "version_files": [name for name in VERSION_FILES if name in files],
+        "changelogs": sorted(changelogs),
+        "release_notes": sorted(release_notes),
+    }
+    _cache[root] = (mtimes, result)
+    return _copy_scan(result)
+
+
+def read_version(project_path, rel_path: str) -> Optional[str]:
+    """Read the version declared in a detected version file."""
+    path = Path(project_path) / rel_path
+    try:
+        content = path.read_text(encoding="utf-8")
+    except (IOError, UnicodeDecodeError):
+        return None
+
+    name = path.name
+    if name.endswith(".json"):
+        try:
+            data = json.loads(content)
+        except json.JSONDecodeError:
+            return None
+        if name == "marketplace.json":
+            return data.get("metadata", {}).get("version") or data.get("version")
+        return data.get("version")
+    if name in ("pyproject.toml", "Cargo.toml"):
+        match = re.search(r'^version\s*=\s*["\']([^"\']+)["\']', content, re.MULTILINE)
+    elif name == "setup.py":
+        match = re.search(r'version\s*=\s*["\']([^"\']+)["\']', content)
+    else:
+        match = re.match(r"\s*(\S+)", content)
+    return match.group(1) if match else None
+
+
+def detect_version(project_path) -> Tuple[Optional[str], Optional[str]]:
+    """Return (version file, version) for the first file declaring a version."""
+    for rel_path in scan_project(project_path)["version_files"]:
+        version = read_version(project_path, rel_path)
+        if version:
+            return rel_path, version
+    return None, None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Detect version files and changelogs of a project")
+    parser.add_argument("project_path", nargs="?", help="Project directory (default: current directory)")
+    parser.add_argument("--json", action="store_true", help="Print the detection result as JSON")
+    args = parser.parse_args()
+
+    project_path = Path(args.project_path).resolve() if args.project_path else Path.cwd()
+    scan = scan_project(project_path)
+    version_file, version = detect_version(project_path)
+
+    if args.json:
+        print(json.dumps({
+            "version_file": version_file,
+            "version": version,
+            "version_files": scan["version_files"],
+            "changelogs": [{"path": p, "lang": lang} for p, lang in scan["changelogs"]],
+            "release_notes": [{"path": p, "lang": lang} for p, lang in scan["release_notes"]],
+        }, indent=2, ensure_ascii=False))
+        return
+
+    print("Project detected:")
+    if version_file:
+        print(f"  Version file: {version_file} ({version})")
+    else:
+        print("  Version file: (none)")
+    print("  Changelogs:")
+    for rel_path, lang in scan["changelogs"]:
+        print(f"    - {rel_path} ({lang})")
+    if scan["release_notes"]:
+        print("  Release notes:")
+        for rel_path, lang in scan["release_notes"]:
+            print(f"    - {rel_path} ({lang})")
+
+
+if __name__ == "__main__":
+    main()
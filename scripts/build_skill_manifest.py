@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+技能清单编译工具
+把 categories/、harness/、release-skills/ 下所有 SKILL.md 的 frontmatter
+（名称、描述、触发词、入口脚本、allowed_tools）编译到 .skills-manifest.json，
+并记录正文在 SKILL.md 中的字节偏移。会话启动时只需读取这一个文件，
+正文按需通过偏移读取。
+
+每条记录保存 SKILL.md 的 SHA-256（与 check_skill_hash.py 计算方式相同）、
+大小和修改时间；refresh 时只对 stat 变化的文件重新计算 hash，hash 变化的
+条目才会重新解析。show 使用正文偏移前同样会检查条目，过期时先刷新。
+check_skill_hash.py 更新 hash 索引后会自动刷新清单。
+
+用法:
+    python3 scripts/build_skill_manifest.py [build]     # 增量刷新清单
+    python3 scripts/build_skill_manifest.py build --full
+    python3 scripts/build_skill_manifest.py check       # 清单过期时返回 1
+    python3 scripts/build_skill_manifest.py show <技能名>  # 按偏移读取正文
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import timing
+from check_skill_hash import compute_file_hash
+from timing import count, span
+
+MANIFEST_NAME = ".skills-manifest.json"
+MANIFEST_VERSION = 1
+SKILL_ROOTS = ["categories", "harness", "release-skills"]
+
+# 描述中的引号短语视为触发词，如 Use when user says "release", "发布"
+# 单引号须在词边界外成对出现，避免把 user's、don't 中的撇号当作引号
+TRIGGER_RE = re.compile(r'"([^"]+)"|“([^”]+)”|(?<!\w)\'([^\'\s][^\']*)\'(?!\w)')
+
+
+def find_skill_files(repo_root):
+    """返回所有 SKILL.md 的相对路径"""
+    found = []
+    with span("scan"):
+        for root_name in SKILL_ROOTS:
+            root = repo_root / root_name
+            if root.exists():
+                found.extend(p.relative_to(repo_root).as_posix() for p in root.rglob("SKILL.md"))
+    count("manifest_files_scanned", len(found))
+    return sorted(found)
+
+
+def _unquote(value):
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        return value[1:-1]
+    return value
+
+
+def parse_frontmatter(data):
+    """解析 YAML frontmatter 的简单子集（标量与 "- item" 列表）
+
+    返回 (字段字典, 正文字节偏移)。没有 frontmatter 时返回 ({}, 0)。
+    """
+    if not data.startswith(b"---"):
+        return {}, 0
+    end = data.find(b"\n---", 3)
+    if end == -1:
+        return {}, 0
+    body_offset = data.find(b"\n", end + 4)
+    body_offset = len(data) if body_offset == -1 else body_offset + 1
+
+    fields = {}
+    key = None
+    for line in data[data.find(b"\n") + 1:end].decode("utf-8", errors="replace").splitlines():
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+        stripped = line.strip()
+        if stripped.startswith("- ") and key is not None:
+            if not isinstance(fields[key], list):
+                fields[key] = []
+            fields[key].append(_unquote(stripped[2:]))
+            continue
+        if ":" in line and not line[0].isspace():
+            key, _, value = line.partition(":")
+            key = key.strip()
+            fields[key] = _unquote(value) if value.strip() else []
+    return fields, body_offset
+
+
+def build_entry(repo_root, rel_path, digest=None):
+    """解析一个 SKILL.md，返回清单条目"""
+    path = repo_root / rel_path
+    with span("read"):
+        data = path.read_bytes()
+    st = path.stat()
+    fields, body_offset = parse_frontmatter(data)
+    skill_dir = path.parent
+
+    description = fields.get("description") or ""
+    if isinstance(description, list):
+        description = " ".join(description)
+    triggers = [next(g for g in match.groups() if g) for match in TRIGGER_RE.finditer(description)]
+
+    allowed_tools = fields.get("allowed_tools") or fields.get("allowed-tools") or []
+    if isinstance(allowed_tools, str):
+        allowed_tools = [tool.strip() for tool in allowed_tools.split(",") if tool.strip()]
+
+    entry_scripts = []
+    declared = fields.get("entry")
+    if isinstance(declared, str) and declared:
+        entry_scripts.append((skill_dir.relative_to(repo_root) / declared).as_posix())
+    scripts_dir = skill_dir / "scripts"
+    if scripts_dir.is_dir():
+        for script in sorted(scripts_dir.glob("*.py")):
+            rel_script = script.relative_to(repo_root).as_posix()
+            if rel_script not in entry_scripts:
+                entry_scripts.append(rel_script)
+
+    count("entries_parsed")
+    return {
+        "name": fields.get("name") or skill_dir.name,
+        "description": description,
+        "triggers": triggers,
+        "allowed_tools": allowed_tools,
+        "entry_scripts": entry_scripts,
+        "path": rel_path,
+        "body_offset": body_offset,
+        "body_length": len(data) - body_offset,
+        "hash": digest or hashlib.sha256(data).hexdigest(),
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+    }
+
+
+def load_manifest(repo_root):
+    """读取清单，格式不符时返回 None"""
+    try:
+        with span("json_load"), open(Path(repo_root) / MANIFEST_NAME, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (IOError, json.JSONDecodeError):
+        return None
+    if manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def entry_is_current(repo_root, entry, digest=None):
+    """条目是否仍与 SKILL.md 一致
+
+    提供 digest（如 check_skill_hash.py 的结果）时直接比较 hash；否则 stat
+    未变化时直接信任，stat 变化时重新计算 hash，一致则仅更新条目的 stat。
+    """
+    try:
+        st = os.stat(Path(repo_root) / entry["path"])
+    except FileNotFoundError:
+        return False
+    if digest is not None:
+        if digest != entry["hash"]:
+            return False
+    elif st.st_size != entry["size"]:
+        return False
+    elif st.st_mtime_ns != entry["mtime_ns"]:
+        if compute_file_hash(Path(repo_root) / entry["path"]) != entry["hash"]:
+            return False
+    entry["size"], entry["mtime_ns"] = st.st_size, st.st_mtime_ns
+    count("cache_hits")
+    return True
+
+
+def stale_entries(repo_root, manifest, skill_files=None, hashes=None):
+    """返回需要重新解析的 SKILL.md 相对路径
+
+    hashes（如 check_skill_hash.py 的结果）中有的文件直接比较 hash，其余文件
+    按 entry_is_current() 检查。skill_files 为 None 时不扫描新增技能，只检查
+    清单中已有的条目。
+    """
+    entries = {entry["path"]: entry for entry in manifest["skills"]}
+    paths = skill_files if skill_files is not None else list(entries)
+    hashes = hashes or {}
+    stale = []
+    for rel_path in paths:
+        entry = entries.get(rel_path)
+        if entry is None or not entry_is_current(repo_root, entry, hashes.get(rel_path)):
+            stale.append(rel_path)
+    if skill_files is not None:
+        known = set(skill_files)
+        stale.extend(path for path in entries if path not in known)
+    return stale
+
+
+def refresh_manifest(repo_root, full=False, hashes=None):
+    """增量刷新清单并写回，返回 (清单, 重新解析的条目数)
+
+    hashes 为 {SKILL.md 相对路径: hash}（如 check_skill_hash.py 的结果），
+    提供时直接以这些 hash 判断条目是否失效。
+    """
+    repo_root = Path(repo_root)
+    skill_files = find_skill_files(repo_root)
+    manifest = None if full else load_manifest(repo_root)
+    entries = {entry["path"]: entry for entry in manifest["skills"]} if manifest else {}
+
+    if manifest is None:
+        stale = skill_files
+    else:
+        stale = stale_entries(repo_root, manifest, skill_files, hashes)
+
+    for rel_path in stale:
+        entries.pop(rel_path, None)
+        if (repo_root / rel_path).exists():
+            entries[rel_path] = build_entry(repo_root, rel_path, (hashes or {}).get(rel_path))
+
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "generated": datetime.now().isoformat(),
+        "totalSkills": len(entries),
+        "skills": [entries[path] for path in sorted(entries)],
+    }
+    with span("json_write"), open(repo_root / MANIFEST_NAME, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, ensure_ascii=False)
+    return manifest, len(stale)
+
+
+def find_entry(manifest, name):
+    """按技能名或 SKILL.md 相对路径查找条目"""
+    for entry in (manifest or {}).get("skills", []):
+        if name in (entry["name"], entry["path"]):
+            return entry
+    return None
+
+
+def read_body(repo_root, entry):
+    """按清单中的偏移读取技能正文；调用前应先用 entry_is_current() 确认条目未过期"""
+    with open(Path(repo_root) / entry["path"], "rb") as f:
+        f.seek(entry["body_offset"])
+        return f.read(entry["body_length"]).decode("utf-8", errors="replace")
+
+
+def main():
+    timing.init_from_argv()
+    parser = argparse.ArgumentParser(description="编译技能 frontmatter 清单")
+    subparsers = parser.add_subparsers(dest="command")
+    p_build = subparsers.add_parser("build", help="刷新清单（默认命令）")
+    p_build.add_argument("--full", action="store_true", help="忽略已有清单，全部重新解析")
+    subparsers.add_parser("check", help="检查清单是否过期")
+    p_show = subparsers.add_parser("show", help="输出技能正文")
+    p_show.add_argument("name")
+    args = parser.parse_args()
+
+    repo_root = Path(__file__).parent.parent
+
+    if args.command == "check":
+        manifest = load_manifest(repo_root)
+        if manifest is None:
+            print(f"❌ 清单不存在或格式不符: {MANIFEST_NAME}")
+            sys.exit(1)
+        stale = stale_entries(repo_root, manifest, find_skill_files(repo_root))
+        if stale:
+            print(f"⚠️  清单已过期 ({len(stale)} 项):")
+            for rel_path in stale:
+                print(f"   - {rel_path}")
+            sys.exit(1)
+        print(f"✅ 清单是最新的 ({manifest['totalSkills']} 个技能)")
+        return
+
+    if args.command == "show":
+        entry = find_entry(load_manifest(repo_root), args.name)
+        # 偏移只在条目仍与文件一致时可用；过期或未找到时先刷新清单
+        if entry is None or not entry_is_current(repo_root, entry):
+            entry = find_entry(refresh_manifest(repo_root)[0], args.name)
+        if entry is None:
+            print(f"❌ 未找到技能: {args.name}")
+            sys.exit(1)
+        print(read_body(repo_root, entry))
+        return
+
+    manifest, rebuilt = refresh_manifest(repo_root, full=getattr(args, "full", False))
+    print(f"✅ 清单已更新: {MANIFEST_NAME} ({manifest['totalSkills']} 个技能, 重新解析 {rebuilt} 项)")
+    for entry in manifest["skills"]:
+        print(f"  📄 {entry['name']:<24} {entry['path']}")
+
+
+if __name__ == "__main__":
+    main()
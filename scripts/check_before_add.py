@@ -10,12 +10,16 @@ import hashlib
 import sys
 from pathlib import Path
 
+import timing
+from timing import count, span
+
 def compute_file_hash(filepath):
     """计算文件的SHA-256 hash"""
     sha256_hash = hashlib.sha256()
-    with open(filepath, "rb") as f:
+    with span("hash"), open(filepath, "rb") as f:
         for chunk in iter(lambda: f.read(4096), b""):
             sha256_hash.update(chunk)
+            count("bytes_hashed", len(chunk))
     return sha256_hash.hexdigest()
 
 def check_duplicate_skill(skill_path, repo_root):
@@ -27,7 +31,7 @@ def check_duplicate_skill(skill_path, repo_root):
         print("   运行 scripts/check_skill_hash.py 生成索引")
         return False
 
-    with open(hash_file, "r", encoding="utf-8") as f:
+    with span("json_load"), open(hash_file, "r", encoding="utf-8") as f:
         index = json.load(f)
 
     # 计算新技能的hash
@@ -40,6 +44,7 @@ def check_duplicate_skill(skill_path, repo_root):
 
     # 检查是否存在相同hash
     for path, info in index.get("skills", {}).items():
+        count("index_entries_compared")
         if info["hash"] == new_hash:
             print(f"⚠️  发现重复技能!")
             print(f"   新技能: {skill_path}")
@@ -50,8 +55,9 @@ def check_duplicate_skill(skill_path, repo_root):
     return False
 
 def main():
+    timing.init_from_argv()
     if len(sys.argv) < 2:
-        print("用法: python3 scripts/check_before_add.py <SKILL.md路径>")
+        print("用法: python3 scripts/check_before_add.py <SKILL.md路径> [--profile] [--timings-json FILE]")
         print("示例: python3 scripts/check_before_add.py categories/code-analysis/my-skill/SKILL.md")
         sys.exit(1)
 
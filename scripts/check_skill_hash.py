@@ -11,12 +11,16 @@ from pathlib import Path
 from collections import defaultdict
 from datetime import datetime
 
+import timing
+from timing import count, span
+
 def compute_file_hash(filepath):
     """计算文件的SHA-256 hash"""
     sha256_hash = hashlib.sha256()
-    with open(filepath, "rb") as f:
+    with span("hash"), open(filepath, "rb") as f:
         for chunk in iter(lambda: f.read(4096), b""):
             sha256_hash.update(chunk)
+            count("bytes_hashed", len(chunk))
     return sha256_hash.hexdigest()
 
 def scan_skills(repo_root):
@@ -28,19 +32,21 @@ def scan_skills(repo_root):
         print(f"❌ 分类目录不存在: {categories_path}")
         return skills
 
-    for skill_md in categories_path.rglob("SKILL.md"):
-        skill_path = str(skill_md.relative_to(repo_root))
-        skill_dir = str(skill_md.parent.relative_to(repo_root))
+    with span("scan"):
+        for skill_md in categories_path.rglob("SKILL.md"):
+            count("files_scanned")
+            skill_path = str(skill_md.relative_to(repo_root))
+            skill_dir = str(skill_md.parent.relative_to(repo_root))
 
-        skill_hash = compute_file_hash(skill_md)
+            skill_hash = compute_file_hash(skill_md)
 
-        skills[skill_path] = {
-            "path": skill_path,
-            "dir": skill_dir,
-            "hash": skill_hash,
-            "size": skill_md.stat().st_size,
-            "modified": datetime.fromtimestamp(skill_md.stat().st_mtime).isoformat()
-        }
+            skills[skill_path] = {
+                "path": skill_path,
+                "dir": skill_dir,
+                "hash": skill_hash,
+                "size": skill_md.stat().st_size,
+                "modified": datetime.fromtimestamp(skill_md.stat().st_mtime).isoformat()
+            }
 
     return skills
 
@@ -70,13 +76,14 @@ def save_hash_index(repo_root, skills):
         } for path, info in skills.items()}
     }
 
-    with open(hash_file, "w", encoding="utf-8") as f:
+    with span("json_write"), open(hash_file, "w", encoding="utf-8") as f:
         json.dump(index, f, indent=2, ensure_ascii=False)
 
     return hash_file
 
 def main():
     import sys
+    timing.init_from_argv()
     repo_root = Path(__file__).parent.parent
 
     print("🔍 扫描技能并计算hash...\n")
@@ -111,6 +118,12 @@ def main():
     hash_file = save_hash_index(repo_root, skills)
     print(f"💾 Hash索引已保存: {hash_file}")
 
+    # 用本次计算的hash刷新技能清单，只重新解析hash变化的技能
+    from build_skill_manifest import MANIFEST_NAME, refresh_manifest
+    with span("manifest"):
+        _, rebuilt = refresh_manifest(repo_root, hashes={path: info["hash"] for path, info in skills.items()})
+    print(f"💾 技能清单已刷新: {MANIFEST_NAME} (重新解析 {rebuilt} 项)")
+
     # 返回状态码（有重复返回1）
     sys.exit(1 if duplicates else 0)
 
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+技能打包/安装工具
+把多个技能目录打包成单个 bundle 文件：文件内容按 SHA-256 去重存储（跨技能共享的
+模板、LICENSE 只存一份），目录表（TOC）压缩存放在文件末尾，并附带与
+.skills-hash.json 格式兼容的 hash 清单。安装时只解压有变化的文件，
+按偏移顺序读取 blob，一次顺序读取即可安装全部技能。
+
+用法:
+    python3 scripts/skill_bundle.py pack <输出文件> [技能目录...]
+    python3 scripts/skill_bundle.py list <bundle>
+    python3 scripts/skill_bundle.py install <bundle> <目标目录> [--skills 名称...]
+    python3 scripts/skill_bundle.py verify <bundle>
+
+不指定技能目录时打包 categories/、harness/、release-skills/ 下所有包含 SKILL.md 的目录。
+
+Bundle 格式:
+    [8 字节 magic][8 字节 TOC 偏移][8 字节 TOC 长度][zlib blob ...][zlib TOC JSON]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import struct
+import sys
+import zlib
+from datetime import datetime
+from pathlib import Path, PurePosixPath
+
+import timing
+from timing import count, span
+
+MAGIC = b"OUSKB\x00\x01\x00"
+HEADER = struct.Struct("<8sQQ")
+BUNDLE_VERSION = 1
+SKILL_ROOTS = ["categories", "harness", "release-skills"]
+IGNORED_DIRS = {"__pycache__", ".git", ".idea", "node_modules"}
+IGNORED_SUFFIXES = (".pyc", ".pyo")
+INSTALL_STATE = ".skills-bundle.json"
+
+
+def find_skill_dirs(repo_root):
+    """返回所有包含 SKILL.md 的技能目录（相对仓库根目录）"""
+    skill_dirs = []
+    for root_name in SKILL_ROOTS:
+        root = repo_root / root_name
+        if not root.exists():
+            continue
+        for skill_md in root.rglob("SKILL.md"):
+            skill_dirs.append(skill_md.parent.relative_to(repo_root))
+    return sorted(skill_dirs)
+
+
+def iter_skill_files(skill_dir):
+    """遍历技能目录下需要打包的文件"""
+    for dirpath, dirnames, filenames in os.walk(skill_dir):
+        dirnames[:] = sorted(d for d in dirnames if d not in IGNORED_DIRS)
+        for filename in sorted(filenames):
+            if not filename.endswith(IGNORED_SUFFIXES):
+                yield Path(dirpath) / filename
+
+
+def pack(repo_root, skill_dirs, output):
+    """打包技能目录，返回统计信息"""
+    blobs = {}
+    skills = {}
+    manifest = {}
+    raw_bytes = 0
+
+    with open(output, "wb") as out:
+        out.write(HEADER.pack(MAGIC, 0, 0))
+        for rel_dir in skill_dirs:
+            files = {}
+            for path in iter_skill_files(repo_root / rel_dir):
+                with span("read"):
+                    data = path.read_bytes()
+                with span("hash"):
+                    digest = hashlib.sha256(data).hexdigest()
+                count("files_scanned")
+                count("bytes_hashed", len(data))
+                raw_bytes += len(data)
+
+                if digest not in blobs:
+                    with span("compress"):
+                        compressed = zlib.compress(data, 9)
+                    blobs[digest] = [out.tell(), len(compressed), len(data)]
+                    out.write(compressed)
+                else:
+                    count("blobs_deduplicated")
+
+                st = path.stat()
+                rel_file = path.relative_to(repo_root / rel_dir).as_posix()
+                files[rel_file] = {"hash": digest, "size": len(data), "mode": st.st_mode & 0o777}
+                if rel_file == "SKILL.md":
+                    manifest[(rel_dir / "SKILL.md").as_posix()] = {
+                        "hash": digest,
+                        "size": len(data),
+                        "modified": datetime.fromtimestamp(st.st_mtime).isoformat(),
+                    }
+            skills[rel_dir.as_posix()] = {"name": rel_dir.name, "files": files}
+
+        toc = {
+            "version": BUNDLE_VERSION,
+            "created": datetime.now().isoformat(),
+            "blobs": blobs,
+            "skills": skills,
+            # 与 .skills-hash.json 相同的结构，可直接用于重复检查
+            "manifest": {
+                "version": "1.0",
+                "lastUpdated": datetime.now().isoformat(),
+                "totalSkills": len(manifest),
+                "skills": manifest,
+            },
+        }
+        with span("toc"):
+            toc_data = zlib.compress(json.dumps(toc, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), 9)
+        toc_offset = out.tell()
+        out.write(toc_data)
+        out.seek(0)
+        out.write(HEADER.pack(MAGIC, toc_offset, len(toc_data)))
+        total = toc_offset + len(toc_data)
+
+    return {"skills": len(skills), "blobs": len(blobs), "raw_bytes": raw_bytes, "bundle_bytes": total}
+
+
+def read_toc(bundle):
+    """读取 bundle 的目录表"""
+    with open(bundle, "rb") as f:
+        magic, toc_offset, toc_length = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"不是技能 bundle 文件: {bundle}")
+        f.seek(toc_offset)
+        toc = json.loads(zlib.decompress(f.read(toc_length)).decode("utf-8"))
+    if toc.get("version") != BUNDLE_VERSION:
+        raise ValueError(f"不支持的 bundle 版本: {toc.get('version')}")
+    return toc
+
+
+def iter_blobs(bundle, toc, digests):
+    """按偏移顺序读取并解压指定 blob，返回 (digest, data)"""
+    ordered = sorted(digests, key=lambda d: toc["blobs"][d][0])
+    with open(bundle, "rb") as f:
+        for digest in ordered:
+            offset, length, _ = toc["blobs"][digest]
+            f.seek(offset)
+            with span("decompress"):
+                data = zlib.decompress(f.read(length))
+            count("bytes_read", length)
+            yield digest, data
+
+
+def select_skills(toc, names):
+    """按技能名或相对路径筛选技能"""
+    if not names:
+        return dict(toc["skills"])
+    wanted = set(names)
+    return {key: skill for key, skill in toc["skills"].items() if key in wanted or skill["name"] in wanted}
+
+
+def load_install_state(target):
+    try:
+        with open(target / INSTALL_STATE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (IOError, json.JSONDecodeError):
+        return {}
+
+
+def is_current(path, entry, state_entry):
+    """目标文件是否已是 bundle 中的内容；stat 与上次安装一致时不重新计算 hash"""
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return False
+    if st.st_size != entry["size"]:
+        return False
+    if state_entry and state_entry["hash"] == entry["hash"] and state_entry.get("mtime_ns") == st.st_mtime_ns:
+        count("cache_hits")
+        return True
+    with span("hash"):
+        return hashlib.sha256(path.read_bytes()).hexdigest() == entry["hash"]
+
+
+def check_install_path(target, rel_path):
+    """校验 bundle 中的相对路径，拒绝绝对路径、`..` 以及解析后位于目标目录之外的路径"""
+    parts = rel_path.split("/")
+    if (PurePosixPath(rel_path).is_absolute() or "\\" in rel_path
+            or any(part in ("", ".", "..") for part in parts) or ":" in parts[0]):
+        raise ValueError(f"bundle 中包含非法路径: {rel_path!r}")
+    root = target.resolve()
+    resolved = (root / rel_path).resolve()
+    if resolved != root and root not in resolved.parents:
+        raise ValueError(f"bundle 中的路径位于目标目录之外: {rel_path!r}")
+
+
+def plan_install(target, skills):
+    """校验所选技能并返回 {安装相对路径: 文件条目}；写入任何文件前调用
+
+    技能按目录名安装，不同分类下同名的技能会互相覆盖，因此直接报错。
+    """
+    owners = {}
+    for key, skill in skills.items():
+        name = skill["name"]
+        if "/" in name:
+            raise ValueError(f"bundle 中包含非法技能名: {name!r}")
+        if name in owners:
+            raise ValueError(f"技能目录名冲突: {owners[name]} 与 {key} 都会安装到 {name}/，请用 --skills 只选其一")
+        owners[name] = key
+
+    installed = {}
+    for skill in skills.values():
+        for rel_file, entry in skill["files"].items():
+            rel_path = f"{skill['name']}/{rel_file}"
+            check_install_path(target, rel_path)
+            installed[rel_path] = entry
+    return installed
+
+
+def install(bundle, target, names=None):
+    """安装（或增量更新）技能到目标目录，返回统计信息"""
+    toc = read_toc(bundle)
+    skills = select_skills(toc, names)
+    installed = plan_install(target, skills)
+    target.mkdir(parents=True, exist_ok=True)
+    state = load_install_state(target)
+
+    # 需要写入的文件：digest -> [(路径, 权限)]
+    pending = {}
+    unchanged = 0
+    for rel_path, entry in installed.items():
+        if is_current(target / rel_path, entry, state.get(rel_path)):
+            unchanged += 1
+        else:
+            pending.setdefault(entry["hash"], []).append((rel_path, entry["mode"]))
+
+    # 上次由 bundle 安装、本次已不存在的文件（仅限本次安装的技能）
+    skill_names = {skill["name"] for skill in skills.values()}
+    stale = [rel_path for rel_path in state
+             if rel_path.split("/", 1)[0] in skill_names and rel_path not in installed]
+    for rel_path in stale:
+        check_install_path(target, rel_path)
+
+    written = 0
+    for digest, data in iter_blobs(bundle, toc, pending):
+        for rel_path, mode in pending[digest]:
+            path = target / rel_path
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(path.name + ".tmp")
+            with span("write"):
+                tmp_path.write_bytes(data)
+                os.chmod(tmp_path, mode)
+                os.replace(tmp_path, path)
+            written += 1
+
+    for rel_path in stale:
+        (target / rel_path).unlink(missing_ok=True)
+        del state[rel_path]
+
+    for rel_path, entry in installed.items():
+        state[rel_path] = {"hash": entry["hash"], "mtime_ns": (target / rel_path).stat().st_mtime_ns}
+    with open(target / INSTALL_STATE, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, separators=(",", ":"))
+
+    return {"skills": len(skills), "written": written, "unchanged": unchanged, "removed": len(stale)}
+
+
+def verify(bundle):
+    """校验所有 blob 的 hash，返回损坏的 digest 列表"""
+    toc = read_toc(bundle)
+    return [digest for digest, data in iter_blobs(bundle, toc, toc["blobs"])
+            if hashlib.sha256(data).hexdigest() != digest]
+
+
+def main():
+    timing.init_from_argv()
+    parser = argparse.ArgumentParser(description="技能打包/安装工具")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    p_pack = subparsers.add_parser("pack", help="打包技能")
+    p_pack.add_argument("output")
+    p_pack.add_argument("skill_dirs", nargs="*", help="技能目录（默认全部）")
+
+    p_list = subparsers.add_parser("list", help="列出 bundle 中的技能")
+    p_list.add_argument("bundle")
+
+    p_install = subparsers.add_parser("install", help="安装或更新技能")
+    p_install.add_argument("bundle")
+    p_install.add_argument("target", help="目标目录，如 .claude/skills")
+    p_install.add_argument("--skills", nargs="+", help="只安装指定技能（名称或路径）")
+
+    p_verify = subparsers.add_parser("verify", help="校验 bundle 完整性")
+    p_verify.add_argument("bundle")
+
+    args = parser.parse_args()
+    repo_root = Path(__file__).parent.parent
+
+    try:
+        if args.command == "pack":
+            if args.skill_dirs:
+                skill_dirs = [Path(os.path.relpath(Path(d).resolve(), repo_root.resolve())) for d in args.skill_dirs]
+            else:
+                skill_dirs = find_skill_dirs(repo_root)
+            stats = pack(repo_root, skill_dirs, args.output)
+            print(f"📦 已打包 {stats['skills']} 个技能 -> {args.output}")
+            print(f"   文件内容: {stats['raw_bytes']} bytes, 唯一 blob: {stats['blobs']}")
+            print(f"   bundle 大小: {stats['bundle_bytes']} bytes")
+
+        elif args.command == "list":
+            toc = read_toc(args.bundle)
+            for key, skill in sorted(toc["skills"].items()):
+                size = sum(entry["size"] for entry in skill["files"].values())
+                print(f"  📄 {skill['name']:<28} {len(skill['files']):>3} 个文件 {size:>9} bytes  ({key})")
+
+        elif args.command == "install":
+            stats = install(args.bundle, Path(args.target), args.skills)
+            print(f"✅ 已安装 {stats['skills']} 个技能到 {args.target}")
+            print(f"   写入: {stats['written']}, 未变化: {stats['unchanged']}, 删除: {stats['removed']}")
+
+        elif args.command == "verify":
+            broken = verify(args.bundle)
+            if broken:
+                print(f"❌ {len(broken)} 个 blob 校验失败")
+                sys.exit(1)
+            print("✅ bundle 校验通过")
+    except (ValueError, OSError, zlib.error) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
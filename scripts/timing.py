@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+耗时统计工具
+为仓库脚本提供命名 span 与计数器，以及统一的 --profile / --timings-json 参数。
+未启用时 span() 返回共享的空上下文，count() 直接返回，开销可忽略。
+
+在脚本入口调用 init_from_argv()：
+    --profile               输出各 span 耗时、计数器和 cProfile 前 20 项（stderr）
+    --profile=FILE          同上，并把 pstats 数据保存到 FILE
+    --timings-json FILE     把 span 耗时和计数器写入 JSON 文件
+"""
+
+import atexit
+import cProfile
+import io
+import json
+import pstats
+import sys
+import time
+from contextlib import nullcontext
+
+_NULL_SPAN = nullcontext()
+
+enabled = False
+_spans = {}
+_counters = {}
+_stack = []
+_profiler = None
+_profile_out = None
+_json_out = None
+_started = None
+
+
+class _Span:
+    """计时上下文，按名称累计耗时和调用次数"""
+
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        _stack.append(self.name)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        key = "/".join(_stack)
+        _stack.pop()
+        total, calls = _spans.get(key, (0.0, 0))
+        _spans[key] = (total + elapsed, calls + 1)
+        return False
+
+
+def span(name):
+    """返回命名计时上下文；嵌套 span 以 parent/child 形式记录"""
+    if not enabled:
+        return _NULL_SPAN
+    return _Span(name)
+
+
+def count(name, n=1):
+    """累加计数器（如 files_scanned、bytes_hashed、cache_hits）"""
+    if not enabled:
+        return
+    _counters[name] = _counters.get(name, 0) + n
+
+
+def report():
+    """返回当前统计结果"""
+    return {
+        "total_seconds": round(time.perf_counter() - _started, 6) if _started else 0.0,
+        "spans": {name: {"seconds": round(total, 6), "calls": calls}
+                  for name, (total, calls) in sorted(_spans.items())},
+        "counters": dict(sorted(_counters.items())),
+    }
+
+
+def _print_summary():
+    data = report()
+    out = sys.stderr
+    print(f"\n⏱️  总耗时: {data['total_seconds'] * 1000:.1f} ms", file=out)
+    for name, info in data["spans"].items():
+        print(f"   {name:<32} {info['seconds'] * 1000:>10.1f} ms  x{info['calls']}", file=out)
+    for name, value in data["counters"].items():
+        print(f"   {name:<32} {value:>10}", file=out)
+
+
+def _finish():
+    if _profiler is not None:
+        _profiler.disable()
+        _print_summary()
+        buffer = io.StringIO()
+        stats = pstats.Stats(_profiler, stream=buffer)
+        stats.sort_stats("cumulative").print_stats(20)
+        print(buffer.getvalue(), file=sys.stderr)
+        if _profile_out:
+            stats.dump_stats(_profile_out)
+            print(f"💾 pstats 已保存: {_profile_out}", file=sys.stderr)
+    if _json_out:
+        with open(_json_out, "w", encoding="utf-8") as f:
+            json.dump(report(), f, indent=2, ensure_ascii=False)
+
+
+def enable(profile=False, profile_out=None, json_out=None):
+    """启用统计；profile=True 时同时启动 cProfile，结果在进程退出时输出"""
+    global enabled, _profiler, _profile_out, _json_out, _started
+    if enabled:
+        return
+    enabled = True
+    _started = time.perf_counter()
+    _profile_out = profile_out
+    _json_out = json_out
+    if profile:
+        _profiler = cProfile.Profile()
+        _profiler.enable()
+    atexit.register(_finish)
+
+
+def init_from_argv(argv=None):
+    """从参数中取出 --profile / --timings-json 并启用统计，返回剩余参数
+
+    默认直接修改 sys.argv，脚本原有的参数解析无需改动。
+    """
+    args = sys.argv if argv is None else argv
+    remaining = []
+    profile = False
+    profile_out = None
+    json_out = None
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        if arg == "--profile":
+            profile = True
+        elif arg.startswith("--profile="):
+            profile, profile_out = True, arg.split("=", 1)[1]
+        elif arg == "--timings-json" and i + 1 < len(args):
+            json_out = args[i + 1]
+            i += 1
+        elif arg.startswith("--timings-json="):
+            json_out = arg.split("=", 1)[1]
+        else:
+            remaining.append(arg)
+        i += 1
+
+    args[:] = remaining
+    if profile or json_out:
+        enable(profile, profile_out, json_out)
+    return args